@@ -14,10 +14,33 @@ function getLogDir(): string {
   return path.join(app.getPath('userData'), 'logs', 'ai')
 }
 
+// One log file per session, started on the first entry and rotated once
+// it grows past MAX_LOG_BYTES; only the newest MAX_LOG_FILES are kept.
+// Session files get their own prefix, so pruning never touches the
+// per-entry ai-*.log files written by earlier versions
+const MAX_LOG_BYTES = 2_000_000
+const MAX_LOG_FILES = 10
+const SESSION_LOG_PREFIX = 'ai-session-'
+
+let logDirReady: Promise<unknown> | null = null
+let currentLogFile: string | null = null
+let currentLogBytes = 0
+
 function getLogFile(): string {
   const ts = new Date().toISOString().replace(/[:.]/g, '-')
   const rand = crypto.randomUUID()
-  return path.join(getLogDir(), `ai-${ts}-${rand}.log`)
+  return path.join(getLogDir(), `${SESSION_LOG_PREFIX}${ts}-${rand}.log`)
+}
+
+async function pruneOldLogs() {
+  const dir = getLogDir()
+  // Names start with an ISO timestamp, so name order is creation order
+  const files = (await fs.promises.readdir(dir))
+    .filter((name) => name.startsWith(SESSION_LOG_PREFIX) && name.endsWith('.log'))
+    .sort()
+  // Runs just before the next file is created; leave room for it
+  const stale = files.slice(0, Math.max(0, files.length - (MAX_LOG_FILES - 1)))
+  await Promise.all(stale.map((name) => fs.promises.rm(path.join(dir, name), { force: true })))
 }
 
 async function appendLog(entry: AiLogEntry) {
@@ -26,9 +49,23 @@ async function appendLog(entry: AiLogEntry) {
     ...entry
   }
   const line = `${JSON.stringify(record)}\n`
-  const file = getLogFile()
-  await fs.promises.mkdir(path.dirname(file), { recursive: true })
-  await fs.promises.appendFile(file, line, 'utf8')
+  const bytes = Buffer.byteLength(line, 'utf8')
+
+  logDirReady ??= fs.promises.mkdir(getLogDir(), { recursive: true })
+  try {
+    await logDirReady
+  } catch (err) {
+    logDirReady = null
+    throw err
+  }
+
+  if (!currentLogFile || currentLogBytes + bytes > MAX_LOG_BYTES) {
+    currentLogFile = getLogFile()
+    currentLogBytes = 0
+    pruneOldLogs().catch((err) => console.warn('Failed to prune AI logs', err))
+  }
+  currentLogBytes += bytes
+  await fs.promises.appendFile(currentLogFile, line, 'utf8')
 }
 
 export function setupAiLogHandlers() {
@@ -1,14 +1,9 @@
 import { ipcMain } from 'electron'
-import path from 'path'
-import { GlossStorage } from '../storage/fsGlossStorage'
 import type { Gloss, UsageInfo } from '../storage/types'
-import { RELATIONSHIP_FIELDS, type RelationshipField } from '../storage/relationRules'
-import { attachTranslationWithNote, markGlossLog } from '../storage/glossOperations'
-
-// Initialize storage with data/ and situations/ paths
-const dataRoot = path.join(process.cwd(), 'data')
-const situationsRoot = path.join(process.cwd(), 'situations')
-const storage = new GlossStorage(dataRoot, situationsRoot)
+import { RELATIONSHIP_FIELDS, isRelationshipField } from '../storage/relationRules'
+import { attachTranslationWithNote, markGlossLog, markGlossLogs } from '../storage/glossOperations'
+import { storage } from '../storage/sharedStorage'
+import { evaluateGoalState } from '../storage/goalStateEval'
 
 export function setupGlossHandlers() {
   ipcMain.handle('gloss:load', async (_, language: string, slug: string) => {
@@ -19,10 +14,20 @@ export function setupGlossHandlers() {
     storage.saveGloss(gloss)
   })
 
+  ipcMain.handle('gloss:saveMany', async (_, glosses: Gloss[]) => {
+    storage.batch(() => {
+      for (const gloss of glosses) storage.saveGloss(gloss)
+    })
+  })
+
   ipcMain.handle('gloss:ensure', async (_, language: string, content: string) => {
     return storage.ensureGloss(language, content)
   })
 
+  ipcMain.handle('gloss:ensureMany', async (_, language: string, contents: string[]) => {
+    return storage.ensureGlosses(language, contents)
+  })
+
   ipcMain.handle('gloss:delete', async (_, language: string, slug: string) => {
     storage.deleteGloss(language, slug)
   })
@@ -31,6 +36,10 @@ export function setupGlossHandlers() {
     return storage.resolveReference(ref)
   })
 
+  ipcMain.handle('gloss:resolveRefs', async (_, refs: string[]) => {
+    return storage.resolveReferences(refs)
+  })
+
   ipcMain.handle(
     'gloss:attachRelation',
     async (_, baseRef: string, field: string, targetRef: string) => {
@@ -41,11 +50,32 @@ export function setupGlossHandlers() {
         throw new Error('Base or target gloss not found')
       }
 
-      if (!RELATIONSHIP_FIELDS.includes(field as RelationshipField)) {
+      if (!isRelationshipField(field)) {
         throw new Error(`Invalid relationship field: ${field}`)
       }
 
-      storage.attachRelation(base, field as RelationshipField, target)
+      storage.attachRelation(base, field, target)
+    }
+  )
+
+  ipcMain.handle(
+    'gloss:attachRelations',
+    async (_, baseRef: string, field: string, targetRefs: string[]) => {
+      const base = storage.resolveReference(baseRef)
+      if (!base) {
+        throw new Error('Base gloss not found')
+      }
+
+      if (!isRelationshipField(field)) {
+        throw new Error(`Invalid relationship field: ${field}`)
+      }
+
+      const targets = storage.resolveReferences(targetRefs)
+      if (targets.some((target) => !target)) {
+        throw new Error('Target gloss not found')
+      }
+
+      storage.attachRelations(base, field, targets as Gloss[])
     }
   )
 
@@ -58,11 +88,11 @@ export function setupGlossHandlers() {
         throw new Error('Base gloss not found')
       }
 
-      if (!RELATIONSHIP_FIELDS.includes(field as RelationshipField)) {
+      if (!isRelationshipField(field)) {
         throw new Error(`Invalid relationship field: ${field}`)
       }
 
-      storage.detachRelation(base, field as RelationshipField, targetRef)
+      storage.detachRelation(base, field, targetRef)
     }
   )
 
@@ -192,6 +222,14 @@ export function setupGlossHandlers() {
     markGlossLog(storage, glossRef, marker)
   })
 
+  ipcMain.handle('gloss:markLogs', async (_, glossRefs: string[], marker: string) => {
+    markGlossLogs(storage, glossRefs, marker)
+  })
+
+  ipcMain.handle('gloss:generation', async () => {
+    return storage.generation
+  })
+
   ipcMain.handle('gloss:noteUsageCount', async (_, noteRef: string) => {
     let count = 0
     const parents: string[] = []
@@ -213,8 +251,6 @@ export function setupGlossHandlers() {
         throw new Error('Gloss not found')
       }
 
-      // Import goal state evaluation
-      const { evaluateGoalState } = await import('../storage/goalStateEval')
       return evaluateGoalState(gloss, storage, nativeLanguage, targetLanguage)
     }
   )
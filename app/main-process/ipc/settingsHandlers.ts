@@ -1,5 +1,6 @@
 import { ipcMain } from 'electron'
 import Store from 'electron-store'
+import { isDeepStrictEqual } from 'node:util'
 
 const store = new Store()
 
@@ -9,6 +10,8 @@ export function setupSettingsHandlers() {
   })
 
   ipcMain.handle('settings:set', async (_, key: string, value: unknown) => {
+    // Every set rewrites the whole settings file; skip values that are already stored
+    if (isDeepStrictEqual(store.get(key), value)) return
     store.set(key, value)
   })
 }
@@ -1,13 +1,15 @@
 import { ipcMain } from 'electron'
 import path from 'path'
 import fs from 'fs'
-import { GlossStorage } from '../storage/fsGlossStorage'
 import type { Gloss } from '../storage/types'
-import { buildGoalNodes, type TreeNode } from '../../renderer/entities/glosses/treeBuilder'
+import { dataRoot, situationsRoot, storage } from '../storage/sharedStorage'
+import { readLanguageFiles } from '../storage/languageFiles'
+import { buildGoalNodes, resolveSituationChildren, type TreeNode } from '../../renderer/entities/glosses/treeBuilder'
+import { hasTag, memoizeResolver, normalizeLanguageCode } from '../../shared/glosses/goalLogic'
 
-const dataRoot = path.join(process.cwd(), 'data')
-const situationsRoot = path.join(process.cwd(), 'situations')
-const storage = new GlossStorage(dataRoot, situationsRoot)
+// Export files written at the same time; large exports would otherwise open
+// every file at once and run into EMFILE
+const MAX_PARALLEL_WRITES = 8
 
 export type SituationExportResult = {
   success: boolean
@@ -32,70 +34,101 @@ export type SituationExportResult = {
 }
 
 function loadLanguageCodes(): string[] {
-  const langDir = path.join(dataRoot, 'language')
-  if (!fs.existsSync(langDir)) return []
-  return fs
-    .readdirSync(langDir)
-    .filter((f) => f.endsWith('.json'))
-    .map((file) => {
-      try {
-        const data = JSON.parse(fs.readFileSync(path.join(langDir, file), 'utf-8'))
-        return (data.isoCode || data.iso_code || file.replace('.json', '')).trim().toLowerCase()
-      } catch (err) {
-        console.warn('Failed to read language file', file, err)
-        return ''
-      }
-    })
+  return readLanguageFiles()
+    .map(({ file, data }) => (data.isoCode || data.iso_code || file.replace('.json', '')).trim().toLowerCase())
     .filter(Boolean)
 }
 
 function loadAllLanguages(): Record<string, { displayName: string; symbol: string }> {
-  const langDir = path.join(dataRoot, 'language')
   const languages: Record<string, { displayName: string; symbol: string }> = {}
 
-  if (!fs.existsSync(langDir)) return languages
-
-  for (const file of fs.readdirSync(langDir)) {
-    if (!file.endsWith('.json')) continue
-
-    try {
-      const data = JSON.parse(fs.readFileSync(path.join(langDir, file), 'utf-8'))
-      if (data.isoCode && data.displayName && data.symbol) {
-        languages[data.isoCode] = { displayName: data.displayName, symbol: data.symbol }
-      }
-    } catch (err) {
-      console.warn('Failed to read language file', file, err)
+  for (const { data } of readLanguageFiles()) {
+    if (data.isoCode && data.displayName && data.symbol) {
+      languages[data.isoCode] = { displayName: data.displayName, symbol: data.symbol }
     }
   }
 
   return languages
 }
 
-function nodeRef(gl: Gloss): string {
-  return `${gl.language}:${gl.slug || gl.content}`
+/**
+ * Languages a situation has goals in, by goal kind. This doesn't depend on
+ * the language pair: a pair can only yield goals if native has procedural
+ * goals or target has understanding goals.
+ */
+function goalLanguages(children: Gloss[]): { procedural: Set<string>; understanding: Set<string> } {
+  const procedural = new Set<string>()
+  const understanding = new Set<string>()
+  for (const child of children) {
+    const lang = normalizeLanguageCode(child.language)
+    if (hasTag(child, 'eng:procedural-paraphrase-expression-goal')) procedural.add(lang)
+    if (hasTag(child, 'eng:understand-expression-goal')) understanding.add(lang)
+  }
+  return { procedural, understanding }
 }
 
-function gatherRefs(root: TreeNode): { refs: string[]; learn: string[] } {
+/**
+ * Unique gloss refs in a goal tree, walked with an explicit stack
+ */
+function gatherRefs(root: TreeNode): string[] {
   const refs: string[] = []
-  const learn: string[] = []
   const seen = new Set<string>()
+  const stack: TreeNode[] = [root]
+
+  while (stack.length) {
+    const node = stack.pop()!
+    if (!seen.has(node.ref)) {
+      seen.add(node.ref)
+      refs.push(node.ref)
+    }
+    stack.push(...node.children)
+  }
+
+  return refs
+}
 
-  function walk(node: TreeNode) {
-    const ref = nodeRef(node.gloss)
-    if (!seen.has(ref)) {
-      seen.add(ref)
-      refs.push(ref)
+/**
+ * Runs file writes at most `limit` at a time. settle() waits for every write
+ * added so far and returns the failures.
+ */
+function createWritePool(limit: number) {
+  const pending: Promise<void>[] = []
+  const waiting: Array<() => void> = []
+  let active = 0
+
+  async function run(write: () => Promise<void>): Promise<void> {
+    if (active < limit) {
+      active++
+    } else {
+      // The finishing write hands its slot straight to us
+      await new Promise<void>((resolve) => waiting.push(resolve))
     }
-    if (node.bold && ref !== nodeRef(root.gloss) && !learn.includes(ref)) {
-      learn.push(ref)
+    try {
+      await write()
+    } finally {
+      const next = waiting.shift()
+      if (next) next()
+      else active--
     }
-    for (const child of node.children || []) {
-      walk(child)
+  }
+
+  return {
+    add(write: () => Promise<void>) {
+      const done = run(write)
+      // Failures are collected by settle(); don't report them as unhandled
+      done.catch(() => {})
+      pending.push(done)
+    },
+    async settle(): Promise<unknown[]> {
+      const results = await Promise.allSettled(pending)
+      return results.flatMap((r) => (r.status === 'rejected' ? [r.reason] : []))
     }
   }
+}
 
-  walk(root)
-  return { refs, learn }
+function describeWriteFailures(failures: unknown[]): string {
+  const first = failures[0] instanceof Error ? failures[0].message : String(failures[0])
+  return `Failed to write ${failures.length} export file${failures.length !== 1 ? 's' : ''}: ${first}`
 }
 
 function cleanupOldExports(outputRoot: string, expectedFiles: Set<string>) {
@@ -134,7 +167,7 @@ function cleanupOldExports(outputRoot: string, expectedFiles: Set<string>) {
   }
 }
 
-function performBatchExport(): SituationExportResult {
+async function performBatchExport(): Promise<SituationExportResult> {
   const outputRoot = situationsRoot
   const result: SituationExportResult = {
     success: false,
@@ -146,8 +179,21 @@ function performBatchExport(): SituationExportResult {
     outputRoot
   }
 
+  // File writes run in the background while the next combination is built;
+  // all of them finish before metadata is written and old files are cleaned
+  const writes = createWritePool(MAX_PARALLEL_WRITES)
+  let writeFailuresReported = false
+
   try {
     const exportedFiles = new Set<string>()
+    // The export only reads glosses, and every language pair revisits the
+    // same ones; resolve each ref from disk once for the whole run
+    const resolver = memoizeResolver(storage)
+    // JSONL line per ref, shared across situations and language pairs;
+    // null marks glosses excluded from learning
+    const serializedLines = new Map<string, string | null>()
+    // Output directories per language pair, created on first use only
+    const createdDirs = new Set<string>()
     const nativeLanguagesUsed = new Set<string>()
     const targetLanguagesByNative = new Map<string, Set<string>>()
     const situationsByNativeTarget = new Map<string, Map<string, { [situation: string]: boolean }>>()
@@ -164,11 +210,19 @@ function performBatchExport(): SituationExportResult {
     }
 
     for (const situation of situations) {
+      // Same children for every language pair; resolve them once
+      const children = resolveSituationChildren(situation, resolver)
+      const goalLangs = goalLanguages(children)
       for (const native of languages) {
         for (const target of languages) {
           if (native === target) continue
 
-          const { nodes } = buildGoalNodes(situation, storage, native, target)
+          const hasCandidates = goalLangs.procedural.has(native) || goalLangs.understanding.has(target)
+          // Each situation and language pair is built once per run, and the
+          // run-wide resolver already shares the gloss reads between them
+          const nodes = hasCandidates
+            ? buildGoalNodes(situation, resolver, native, target, { children, withLogs: false }).nodes
+            : []
           if (!nodes.length) {
             result.skipped.push({
               situation: `${situation.language}:${situation.slug}`,
@@ -201,9 +255,8 @@ function performBatchExport(): SituationExportResult {
             const goalType = root.goal_type
             if (goalType !== 'procedural' && goalType !== 'understanding') continue
 
-            const { refs } = gatherRefs(root)
-            refs.forEach((r) => allRefs.add(r))
-            const challenge = nodeRef(root.gloss)
+            for (const ref of gatherRefs(root)) allRefs.add(ref)
+            const challenge = root.ref
             if (goalType === 'procedural') {
               exportObj['procedural-paraphrase-expression-goals'].push(challenge)
             } else {
@@ -224,25 +277,39 @@ function performBatchExport(): SituationExportResult {
             continue
           }
 
-          const jsonlLines: string[] = []
+          const outputDir = path.join(outputRoot, native, target)
+          if (!createdDirs.has(outputDir)) {
+            fs.mkdirSync(outputDir, { recursive: true })
+            createdDirs.add(outputDir)
+          }
+          const baseFilename = situation.content
+          const situationJsonPath = path.join(outputDir, `${baseFilename}.json`)
+          const glossesJsonlPath = path.join(outputDir, `${baseFilename}.jsonl`)
+
+          const lines: string[] = []
           let excludedCount = 0
           for (const ref of Array.from(allRefs).sort()) {
-            const gloss = storage.resolveReference(ref)
-            if (!gloss) continue
-            if (gloss.needsHumanCheck || gloss.excludeFromLearning) {
+            let line = serializedLines.get(ref)
+            if (line === undefined) {
+              const gloss = resolver.resolveReference(ref)
+              if (!gloss) continue
+              if (gloss.needsHumanCheck || gloss.excludeFromLearning) {
+                line = null
+              } else {
+                const { slug, ...rest } = gloss as Gloss
+                void slug
+                line = JSON.stringify({ ...rest, ref }, null, 0)
+              }
+              serializedLines.set(ref, line)
+            }
+            if (line === null) {
               excludedCount += 1
               continue
             }
-            const { slug, ...rest } = gloss as Gloss
-            void slug
-            jsonlLines.push(JSON.stringify({ ...rest, ref }, null, 0))
+            lines.push(line)
           }
-
-          const outputDir = path.join(outputRoot, native, target)
-          fs.mkdirSync(outputDir, { recursive: true })
-          const baseFilename = situation.content
-          const situationJsonPath = path.join(outputDir, `${baseFilename}.json`)
-          const glossesJsonlPath = path.join(outputDir, `${baseFilename}.jsonl`)
+          const jsonlContent = lines.join('\n')
+          writes.add(() => fs.promises.writeFile(glossesJsonlPath, jsonlContent, 'utf-8'))
 
           let situationImageFilename: string | false = false
 
@@ -256,14 +323,14 @@ function performBatchExport(): SituationExportResult {
               situationImageFilename = `${baseFilename}.webp`
               const situationImagePath = path.join(outputDir, situationImageFilename)
 
-              fs.copyFileSync(sourceImagePath, situationImagePath)
+              writes.add(() => fs.promises.copyFile(sourceImagePath, situationImagePath))
               exportedFiles.add(situationImagePath)
             }
           }
 
           // Write situation JSON without image field
-          fs.writeFileSync(situationJsonPath, JSON.stringify(exportObj, null, 2), 'utf-8')
-          fs.writeFileSync(glossesJsonlPath, jsonlLines.join('\n'), 'utf-8')
+          const situationJson = JSON.stringify(exportObj, null, 2)
+          writes.add(() => fs.promises.writeFile(situationJsonPath, situationJson, 'utf-8'))
           exportedFiles.add(situationJsonPath)
           exportedFiles.add(glossesJsonlPath)
 
@@ -299,6 +366,12 @@ function performBatchExport(): SituationExportResult {
       }
     }
 
+    const failures = await writes.settle()
+    writeFailuresReported = true
+    if (failures.length) {
+      throw new Error(describeWriteFailures(failures))
+    }
+
     // Write metadata files
     // 1. Root level: languages.json
     const allLanguages = loadAllLanguages()
@@ -337,6 +410,16 @@ function performBatchExport(): SituationExportResult {
     result.error = err instanceof Error ? err.message : String(err)
     result.success = false
     return result
+  } finally {
+    // A failure part-way through the loop must not leave queued writes
+    // running unobserved; wait for them and report what failed
+    if (!writeFailuresReported) {
+      const failures = await writes.settle()
+      if (failures.length) {
+        result.success = false
+        result.error = [result.error, describeWriteFailures(failures)].filter(Boolean).join('; ')
+      }
+    }
   }
 }
 
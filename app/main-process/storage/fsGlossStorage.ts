@@ -3,27 +3,88 @@ import path from 'path'
 import { deriveSlug } from './slug'
 import {
   RELATIONSHIP_FIELDS,
+  isRelationshipField,
   WITHIN_LANGUAGE_RELATIONS,
   SYMMETRICAL_RELATIONS,
   type RelationshipField
 } from './relationRules'
 import type { Gloss } from './types'
 
+// How long a tag-index check against the files on disk stays valid
+const TAG_INDEX_MAX_AGE_MS = 2_000
+
 /**
  * File system-based gloss storage
  * Ported from src/shared/storage.py:GlossStorage
  */
+
 export class GlossStorage {
+  private writeGeneration = 0
+  // Writes held back while a batch() runs, keyed by file path
+  private pendingWrites: Map<string, Gloss> | null = null
+  // tag -> refs and ref -> tags, built on the first tag lookup and kept up
+  // to date by writes and deletes made through this instance
+  private tagIndex: Map<string, Set<string>> | null = null
+  private indexedTags = new Map<string, string[]>()
+  // File mtime each ref was indexed at, so changes made outside the app
+  // (git pull, manual edits) are picked up by re-reading only those files
+  private indexedMtimes = new Map<string, number>()
+  private tagIndexCheckedAt = 0
+
   constructor(
     private dataRoot: string,
     private situationsRoot: string
   ) {}
 
+  /**
+   * Counter bumped on every write or delete; lets callers cache derived
+   * data and detect when it went stale
+   */
+  get generation(): number {
+    return this.writeGeneration
+  }
+
+  /**
+   * Run several operations and write each touched gloss file once at the end,
+   * instead of after every change. Loads inside the batch see the pending
+   * state; directory scans only see files already on disk.
+   */
+  batch<T>(operations: () => T): T {
+    // Nested batches join the outer one
+    if (this.pendingWrites) return operations()
+
+    const pending = new Map<string, Gloss>()
+    this.pendingWrites = pending
+    let failed = false
+    let failure: unknown
+    try {
+      return operations()
+    } catch (error) {
+      failed = true
+      failure = error
+      throw error
+    } finally {
+      this.pendingWrites = null
+      // Write every pending gloss even if one fails, so a single bad file
+      // doesn't drop the rest of the batch
+      for (const [filePath, gloss] of pending) {
+        try {
+          this.writeGloss(filePath, gloss)
+        } catch (error) {
+          if (!failed) {
+            failed = true
+            failure = error
+          }
+        }
+      }
+      // The operations' own error wins; otherwise report the first write error
+      if (failed) throw failure
+    }
+  }
+
   private languageDir(language: string): string {
     const lang = language.toLowerCase().trim()
-    const dir = path.join(this.dataRoot, 'gloss', lang)
-    fs.mkdirSync(dir, { recursive: true })
-    return dir
+    return path.join(this.dataRoot, 'gloss', lang)
   }
 
   private pathFor(language: string, slug: string): string {
@@ -32,26 +93,42 @@ export class GlossStorage {
 
   loadGloss(language: string, slug: string): Gloss | null {
     const filePath = this.pathFor(language, slug)
-    if (!fs.existsSync(filePath)) return null
+    const pending = this.pendingWrites?.get(filePath)
+    if (pending) return structuredClone(pending)
 
+    // Read directly instead of checking existence first; a missing file is
+    // a normal lookup miss, not an error
     try {
       const data = JSON.parse(fs.readFileSync(filePath, 'utf-8'))
       return this.fromDict(data, slug, language)
     } catch (error) {
+      if ((error as NodeJS.ErrnoException).code === 'ENOENT') return null
       console.error(`Failed to load gloss ${language}:${slug}:`, error)
       return null
     }
   }
 
   resolveReference(ref: string): Gloss | null {
-    const parts = ref.split(':')
-    if (parts.length < 2) return null
-    const language = parts[0]?.trim()
-    const slug = parts.slice(1).join(':').trim()
+    // Split on the first colon only; slugs may themselves contain colons
+    const sep = ref.indexOf(':')
+    if (sep < 0) return null
+    const language = ref.slice(0, sep).trim()
+    const slug = ref.slice(sep + 1).trim()
     if (!language || !slug) return null
     return this.loadGloss(language, slug)
   }
 
+  /**
+   * Resolve many refs in one call; results line up with the input order
+   */
+  resolveReferences(refs: string[]): Array<Gloss | null> {
+    const resolved = new Map<string, Gloss | null>()
+    return refs.map((ref) => {
+      if (!resolved.has(ref)) resolved.set(ref, this.resolveReference(ref))
+      return resolved.get(ref)!
+    })
+  }
+
   findGlossByContent(language: string, content: string): Gloss | null {
     try {
       const slug = deriveSlug(content)
@@ -62,12 +139,23 @@ export class GlossStorage {
   }
 
   ensureGloss(language: string, content: string): Gloss {
-    const existing = this.findGlossByContent(language, content)
+    // Derive the slug and path once for both the lookup and the write
+    const slug = deriveSlug(content)
+    const lang = language.toLowerCase().trim()
+    const filePath = this.pathFor(lang, slug)
+    const existing = this.loadGloss(lang, slug)
     if (existing) return existing
 
+    // loadGloss also returns null for a file it could not parse; never
+    // replace such a file with an empty gloss
+    if (fs.existsSync(filePath)) {
+      throw new Error(`Gloss file for ${lang}:${slug} exists but could not be read`)
+    }
+
     const gloss: Gloss = {
       content,
-      language: language.toLowerCase().trim(),
+      language: lang,
+      slug,
       transcriptions: {},
       logs: {},
       morphologically_related: [],
@@ -89,7 +177,24 @@ export class GlossStorage {
       unambigiousImages: []
     }
 
-    return this.createGloss(gloss)
+    this.writeGloss(filePath, gloss)
+    return gloss
+  }
+
+  /**
+   * ensureGloss for many contents of one language; results follow the input
+   * order and repeated contents map to the same gloss
+   */
+  ensureGlosses(language: string, contents: string[]): Gloss[] {
+    const ensured = new Map<string, Gloss>()
+    return contents.map((content) => {
+      let gloss = ensured.get(content)
+      if (!gloss) {
+        gloss = this.ensureGloss(language, content)
+        ensured.set(content, gloss)
+      }
+      return gloss
+    })
   }
 
   createGloss(gloss: Gloss): Gloss {
@@ -97,7 +202,7 @@ export class GlossStorage {
     const language = gloss.language.toLowerCase().trim()
     const filePath = this.pathFor(language, slug)
 
-    if (fs.existsSync(filePath)) {
+    if (this.pendingWrites?.has(filePath) || fs.existsSync(filePath)) {
       // Gloss already exists, load and return it
       return this.loadGloss(language, slug)!
     }
@@ -118,14 +223,101 @@ export class GlossStorage {
 
   deleteGloss(language: string, slug: string): void {
     const filePath = this.pathFor(language, slug)
+    this.pendingWrites?.delete(filePath)
     if (fs.existsSync(filePath)) {
       fs.unlinkSync(filePath)
+      this.writeGeneration++
+      this.indexTags(`${language.toLowerCase().trim()}:${slug}`, [])
     }
   }
 
   private writeGloss(filePath: string, gloss: Gloss): void {
+    if (this.pendingWrites) {
+      this.pendingWrites.set(filePath, gloss)
+      return
+    }
     const data = this.toDict(gloss)
+    fs.mkdirSync(path.dirname(filePath), { recursive: true })
     fs.writeFileSync(filePath, JSON.stringify(data, null, 2), 'utf-8')
+    this.writeGeneration++
+    this.indexTags(`${gloss.language}:${path.basename(filePath, '.json')}`, gloss.tags)
+  }
+
+  /**
+   * Record the current tags of a ref in the tag index (no-op until the index
+   * has been built)
+   */
+  private indexTags(ref: string, tags: string[]): void {
+    if (!this.tagIndex) return
+    for (const tag of this.indexedTags.get(ref) ?? []) {
+      this.tagIndex.get(tag)?.delete(ref)
+    }
+    for (const tag of tags) {
+      let refs = this.tagIndex.get(tag)
+      if (!refs) {
+        refs = new Set()
+        this.tagIndex.set(tag, refs)
+      }
+      refs.add(ref)
+    }
+    if (tags.length) this.indexedTags.set(ref, [...tags])
+    else this.indexedTags.delete(ref)
+  }
+
+  private ensureTagIndex(): Map<string, Set<string>> {
+    if (!this.tagIndex) {
+      this.tagIndex = new Map()
+      this.indexedTags.clear()
+      this.indexedMtimes.clear()
+      this.tagIndexCheckedAt = 0
+    }
+    // Lookups in quick succession (e.g. typing in a search) share one check
+    const now = Date.now()
+    if (now - this.tagIndexCheckedAt >= TAG_INDEX_MAX_AGE_MS) {
+      this.refreshTagIndex()
+      this.tagIndexCheckedAt = now
+    }
+    return this.tagIndex
+  }
+
+  /**
+   * Bring the tag index in line with the files on disk: stat every gloss
+   * file, re-read only new or modified ones and drop removed ones
+   */
+  private refreshTagIndex(): void {
+    const seen = new Set<string>()
+    const glossDir = path.join(this.dataRoot, 'gloss')
+    const languages = fs.existsSync(glossDir) ? fs.readdirSync(glossDir, { withFileTypes: true }) : []
+
+    for (const langEntry of languages) {
+      if (!langEntry.isDirectory()) continue
+      const dir = path.join(glossDir, langEntry.name)
+      for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+        if (!entry.isFile() || !entry.name.endsWith('.json')) continue
+        const slug = entry.name.slice(0, -'.json'.length)
+        const ref = `${langEntry.name.toLowerCase()}:${slug}`
+        seen.add(ref)
+
+        let mtime: number
+        try {
+          mtime = fs.statSync(path.join(dir, entry.name)).mtimeMs
+        } catch {
+          continue
+        }
+        if (this.indexedMtimes.get(ref) === mtime) continue
+
+        const gloss = this.loadGloss(langEntry.name, slug)
+        this.indexTags(ref, gloss?.tags ?? [])
+        this.indexedMtimes.set(ref, mtime)
+      }
+    }
+
+    for (const ref of this.indexedMtimes.keys()) {
+      if (!seen.has(ref)) {
+        this.indexTags(ref, [])
+        this.indexedMtimes.delete(ref)
+      }
+    }
   }
 
   private fromDict(data: Record<string, unknown>, slug?: string, language?: string): Gloss {
@@ -162,7 +354,7 @@ export class GlossStorage {
   }
 
   attachRelation(base: Gloss, field: RelationshipField, target: Gloss): void {
-    if (!RELATIONSHIP_FIELDS.includes(field)) {
+    if (!isRelationshipField(field)) {
       throw new Error(`Unknown relation field: ${field}`)
     }
 
@@ -191,6 +383,18 @@ export class GlossStorage {
     }
   }
 
+  /**
+   * Attach many targets through the same relation; the base gloss is written
+   * once rather than once per target
+   */
+  attachRelations(base: Gloss, field: RelationshipField, targets: Gloss[]): void {
+    this.batch(() => {
+      for (const target of targets) {
+        this.attachRelation(base, field, target)
+      }
+    })
+  }
+
   detachRelation(base: Gloss, field: RelationshipField, targetRef: string): void {
     const baseRecord = base as Record<string, string[]>
     const existing = baseRecord[field] ?? []
@@ -218,10 +422,11 @@ export class GlossStorage {
     const dir = this.languageDir(language)
     if (!fs.existsSync(dir)) return
 
-    const files = fs.readdirSync(dir)
-    for (const file of files) {
-      if (!file.endsWith('.json')) continue
-      const slug = file.replace('.json', '')
+    // Dirent entries carry the file type, so no extra stat per file is needed
+    const entries = fs.readdirSync(dir, { withFileTypes: true })
+    for (const entry of entries) {
+      if (!entry.isFile() || !entry.name.endsWith('.json')) continue
+      const slug = entry.name.slice(0, -'.json'.length)
       const gloss = this.loadGloss(language, slug)
       if (gloss) yield gloss
     }
@@ -235,21 +440,25 @@ export class GlossStorage {
     const glossDir = path.join(this.dataRoot, 'gloss')
     if (!fs.existsSync(glossDir)) return
 
-    const languages = fs.readdirSync(glossDir)
-    for (const lang of languages) {
-      const langPath = path.join(glossDir, lang)
-      if (!fs.statSync(langPath).isDirectory()) continue
+    const entries = fs.readdirSync(glossDir, { withFileTypes: true })
+    for (const entry of entries) {
+      if (!entry.isDirectory()) continue
 
-      yield* this.iterateGlossesByLanguage(lang)
+      yield* this.iterateGlossesByLanguage(entry.name)
     }
   }
 
   /**
-   * Find glosses by tag (lazy iteration)
+   * Find glosses by tag (lazy iteration). The first call scans all glosses
+   * to build a tag index; later calls only re-read files that changed on
+   * disk, then load the matching glosses.
    */
   *findGlossesByTag(tagRef: string): Generator<Gloss> {
-    for (const gloss of this.iterateAllGlosses()) {
-      if (gloss.tags.includes(tagRef)) {
+    // Copy the refs: callers may save the yielded glosses, which updates the index
+    const refs = [...(this.ensureTagIndex().get(tagRef) ?? [])]
+    for (const ref of refs) {
+      const gloss = this.resolveReference(ref)
+      if (gloss && gloss.tags.includes(tagRef)) {
         yield gloss
       }
     }
@@ -323,31 +532,10 @@ export class GlossStorage {
     }
   }
 
+  /**
+   * Eager list built from the lazy iterators; prefer iterating directly
+   */
   listGlosses(language?: string): Gloss[] {
-    const glosses: Gloss[] = []
-
-    if (language) {
-      const dir = this.languageDir(language)
-      if (!fs.existsSync(dir)) return glosses
-
-      const files = fs.readdirSync(dir)
-      for (const file of files) {
-        if (!file.endsWith('.json')) continue
-        const slug = file.replace('.json', '')
-        const gloss = this.loadGloss(language, slug)
-        if (gloss) glosses.push(gloss)
-      }
-    } else {
-      // List all glosses across all languages
-      const glossDir = path.join(this.dataRoot, 'gloss')
-      if (!fs.existsSync(glossDir)) return glosses
-
-      const languages = fs.readdirSync(glossDir)
-      for (const lang of languages) {
-        glosses.push(...this.listGlosses(lang))
-      }
-    }
-
-    return glosses
+    return Array.from(language ? this.iterateGlossesByLanguage(language) : this.iterateAllGlosses())
   }
 }
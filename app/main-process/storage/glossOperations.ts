@@ -40,21 +40,24 @@ export function attachTranslationWithNote(
   noteText: string | null,
   noteLanguage: string
 ): Gloss {
-  // Create or find translation gloss
-  const translationGloss = storage.ensureGloss(translationLanguage, translationText)
+  // The translation gloss is touched by several steps; write it once
+  return storage.batch(() => {
+    // Create or find translation gloss
+    const translationGloss = storage.ensureGloss(translationLanguage, translationText)
 
-  // Bidirectional translation relation
-  storage.attachRelation(sourceGloss, 'translations', translationGloss)
-  storage.attachRelation(translationGloss, 'translations', sourceGloss)
+    // Bidirectional translation relation
+    storage.attachRelation(sourceGloss, 'translations', translationGloss)
+    storage.attachRelation(translationGloss, 'translations', sourceGloss)
 
-  // One-way note relation (if note exists)
-  // Note is in native language, attached TO the target translation
-  if (noteText && noteText.trim()) {
-    const noteGloss = storage.ensureGloss(noteLanguage, noteText.trim())
-    storage.attachRelation(translationGloss, 'notes', noteGloss)
-  }
+    // One-way note relation (if note exists)
+    // Note is in native language, attached TO the target translation
+    if (noteText && noteText.trim()) {
+      const noteGloss = storage.ensureGloss(noteLanguage, noteText.trim())
+      storage.attachRelation(translationGloss, 'notes', noteGloss)
+    }
 
-  return translationGloss
+    return translationGloss
+  })
 }
 
 /**
@@ -101,3 +104,35 @@ export function markGlossLog(
   gloss.logs = logs
   storage.saveGloss(gloss)
 }
+
+/**
+ * Add the same log marker to many glosses
+ *
+ * All entries share one timestamp, glosses that already carry the marker
+ * are left untouched, and the writes happen in one storage batch.
+ *
+ * @param storage - GlossStorage instance
+ * @param glossRefs - Gloss references in format "language:slug"
+ * @param marker - Log marker string to add
+ * @throws Error if any gloss is not found (nothing is marked then)
+ */
+export function markGlossLogs(
+  storage: GlossStorage,
+  glossRefs: string[],
+  marker: string
+): void {
+  const glosses = storage.resolveReferences(glossRefs)
+  const missing = glossRefs.filter((_, idx) => !glosses[idx])
+  if (missing.length) {
+    throw new Error(`Gloss not found: ${missing.join(', ')}`)
+  }
+
+  const timestamp = new Date().toISOString()
+  storage.batch(() => {
+    for (const gloss of new Set(glosses as Gloss[])) {
+      if (Object.values(gloss.logs).includes(marker)) continue
+      gloss.logs = { ...gloss.logs, [timestamp]: marker }
+      storage.saveGloss(gloss)
+    }
+  })
+}
@@ -0,0 +1,53 @@
+import fs from 'fs'
+import path from 'path'
+import { dataRoot } from './sharedStorage'
+
+export type LanguageFile = {
+  file: string
+  data: {
+    isoCode?: string
+    iso_code?: string
+    displayName?: string
+    symbol?: string
+    [key: string]: unknown
+  }
+}
+
+// Parsed language files by file name; a file is only re-read when its
+// modification time changes
+const parsedFiles = new Map<string, { mtimeMs: number; entry: LanguageFile | null }>()
+
+/**
+ * All parseable language files in data/language, in directory order
+ */
+export function readLanguageFiles(): LanguageFile[] {
+  const langDir = path.join(dataRoot, 'language')
+  if (!fs.existsSync(langDir)) return []
+
+  const entries: LanguageFile[] = []
+  const present = new Set<string>()
+  for (const file of fs.readdirSync(langDir)) {
+    if (!file.endsWith('.json')) continue
+    present.add(file)
+
+    const filePath = path.join(langDir, file)
+    const { mtimeMs } = fs.statSync(filePath)
+    let cached = parsedFiles.get(file)
+    if (!cached || cached.mtimeMs !== mtimeMs) {
+      let entry: LanguageFile | null = null
+      try {
+        entry = { file, data: JSON.parse(fs.readFileSync(filePath, 'utf-8')) }
+      } catch (err) {
+        console.warn('Failed to read language file', file, err)
+      }
+      cached = { mtimeMs, entry }
+      parsedFiles.set(file, cached)
+    }
+    if (cached.entry) entries.push(cached.entry)
+  }
+
+  for (const file of parsedFiles.keys()) {
+    if (!present.has(file)) parsedFiles.delete(file)
+  }
+  return entries
+}
@@ -0,0 +1,12 @@
+import path from 'path'
+import { GlossStorage } from './fsGlossStorage'
+
+// Initialize storage with data/ and situations/ paths
+export const dataRoot = path.join(process.cwd(), 'data')
+export const situationsRoot = path.join(process.cwd(), 'situations')
+
+/**
+ * The one storage instance shared by all IPC handlers, so that caches keyed
+ * on its write generation see every write
+ */
+export const storage = new GlossStorage(dataRoot, situationsRoot)
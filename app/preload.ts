@@ -19,10 +19,14 @@ export type ElectronAPI = {
   gloss: {
     load: (language: string, slug: string) => Promise<Gloss | null>
     save: (gloss: Gloss) => Promise<void>
+    saveMany: (glosses: Gloss[]) => Promise<void>
     ensure: (language: string, content: string) => Promise<Gloss>
+    ensureMany: (language: string, contents: string[]) => Promise<Gloss[]>
     delete: (language: string, slug: string) => Promise<void>
     resolveRef: (ref: string) => Promise<Gloss>
+    resolveRefs: (refs: string[]) => Promise<Array<Gloss | null>>
     attachRelation: (baseRef: string, field: string, targetRef: string) => Promise<void>
+    attachRelations: (baseRef: string, field: string, targetRefs: string[]) => Promise<void>
     detachRelation: (baseRef: string, field: string, targetRef: string) => Promise<void>
     updateContent: (ref: string, newContent: string) => Promise<void>
     checkReferences: (ref: string) => Promise<UsageInfo>
@@ -38,7 +42,9 @@ export type ElectronAPI = {
       noteLanguage: string
     ) => Promise<Gloss>
     markLog: (glossRef: string, marker: string) => Promise<void>
+    markLogs: (glossRefs: string[], marker: string) => Promise<void>
     noteUsageCount: (noteRef: string) => Promise<{ count: number; parents: string[] }>
+    generation: () => Promise<number>
     evaluateGoalState: (
       glossRef: string,
       nativeLanguage: string,
@@ -75,11 +81,16 @@ const api: ElectronAPI = {
   gloss: {
     load: (language, slug) => ipcRenderer.invoke('gloss:load', language, slug),
     save: (gloss) => ipcRenderer.invoke('gloss:save', gloss),
+    saveMany: (glosses) => ipcRenderer.invoke('gloss:saveMany', glosses),
     ensure: (language, content) => ipcRenderer.invoke('gloss:ensure', language, content),
+    ensureMany: (language, contents) => ipcRenderer.invoke('gloss:ensureMany', language, contents),
     delete: (language, slug) => ipcRenderer.invoke('gloss:delete', language, slug),
     resolveRef: (ref) => ipcRenderer.invoke('gloss:resolveRef', ref),
+    resolveRefs: (refs) => ipcRenderer.invoke('gloss:resolveRefs', refs),
     attachRelation: (baseRef, field, targetRef) =>
       ipcRenderer.invoke('gloss:attachRelation', baseRef, field, targetRef),
+    attachRelations: (baseRef, field, targetRefs) =>
+      ipcRenderer.invoke('gloss:attachRelations', baseRef, field, targetRefs),
     detachRelation: (baseRef, field, targetRef) =>
       ipcRenderer.invoke('gloss:detachRelation', baseRef, field, targetRef),
     updateContent: (ref, newContent) =>
@@ -101,7 +112,9 @@ const api: ElectronAPI = {
         noteLanguage
       ),
     markLog: (glossRef, marker) => ipcRenderer.invoke('gloss:markLog', glossRef, marker),
+    markLogs: (glossRefs, marker) => ipcRenderer.invoke('gloss:markLogs', glossRefs, marker),
     noteUsageCount: (noteRef) => ipcRenderer.invoke('gloss:noteUsageCount', noteRef),
+    generation: () => ipcRenderer.invoke('gloss:generation'),
     evaluateGoalState: (glossRef, nativeLanguage, targetLanguage) =>
       ipcRenderer.invoke('gloss:evaluateGoalState', glossRef, nativeLanguage, targetLanguage)
   },
@@ -5,15 +5,20 @@
 
 import { Agent, run } from '@openai/agents'
 import { OpenAIChatCompletionsModel } from '@openai/agents-openai'
-import OpenAI from 'openai'
+import type OpenAI from 'openai'
 import { logAi } from './aiLogger'
+import { getOpenAIClient } from './openaiClient'
 
 const MODEL_NAME = 'gpt-4o-mini'
 const TEMPERATURE_CREATIVE = 0.7
+// Output budget: room for the JSON wrapper plus one short expression per goal
+const TOKENS_BASE = 64
+const TOKENS_PER_GOAL = 48
 const SYSTEM_UNDERSTANDING =
   'You create expressions in the target language that a learner needs to understand in various situations.'
 const SYSTEM_PROCEDURAL =
   'You create practical expression goals a learner wants to express in the native language.'
+const GOAL_LIST_INSTRUCTIONS = 'Return ONLY JSON with a top-level "goals" array of strings. No prose.'
 
 interface GeneratedGoals {
   goals: string[]
@@ -21,15 +26,41 @@ interface GeneratedGoals {
   message: string
 }
 
-async function runJsonList(apiKey: string, prompt: string): Promise<string[]> {
+// One agent per client and output budget; both goal kinds share it, so every
+// request goes out with the same instructions and settings
+const goalAgents = new WeakMap<OpenAI, Map<number, Agent>>()
+
+function goalAgent(client: OpenAI, maxTokens: number): Agent {
+  let agents = goalAgents.get(client)
+  if (!agents) {
+    agents = new Map()
+    goalAgents.set(client, agents)
+  }
+  let agent = agents.get(maxTokens)
+  if (!agent) {
+    agent = new Agent({
+      name: 'goal-generator',
+      instructions: GOAL_LIST_INSTRUCTIONS,
+      model: new OpenAIChatCompletionsModel(client, MODEL_NAME),
+      modelSettings: { temperature: TEMPERATURE_CREATIVE, maxTokens }
+    })
+    agents.set(maxTokens, agent)
+  }
+  return agent
+}
+
+/**
+ * Prompt line for the user's extra context; blank input adds nothing
+ */
+function contextLine(extraContext: string): string {
+  const context = extraContext.trim()
+  return context ? `Additional context: ${context}` : ''
+}
+
+async function runJsonList(apiKey: string, prompt: string, numGoals: number): Promise<string[]> {
   const started = performance.now()
-  const client = new OpenAI({ apiKey, dangerouslyAllowBrowser: true })
-  const agent = new Agent({
-    name: 'goal-generator',
-    instructions: 'Return ONLY JSON with a top-level "goals" array of strings. No prose.',
-    model: new OpenAIChatCompletionsModel(client, MODEL_NAME),
-    modelSettings: { temperature: TEMPERATURE_CREATIVE }
-  })
+  const maxTokens = TOKENS_BASE + TOKENS_PER_GOAL * numGoals
+  const agent = goalAgent(getOpenAIClient(apiKey, maxTokens), maxTokens)
   try {
     const result = await run(agent, prompt)
     const content = (result.finalOutput ?? '').toString().trim() || '{}'
@@ -62,7 +93,7 @@ export async function generateUnderstandingGoals(
   numGoals: number = 5,
   extraContext: string = ''
 ): Promise<GeneratedGoals> {
-  const contextText = extraContext ? `Additional context: ${extraContext}` : ''
+  const contextText = contextLine(extraContext)
   const userPrompt = `${SYSTEM_UNDERSTANDING}
 
 Generate ${numGoals} expressions in ${targetLanguage} for the situation: "${situationContent}".
@@ -85,7 +116,7 @@ ${contextText}
 
 Return JSON with a 'goals' array of strings.`
 
-  const goals = await runJsonList(apiKey, userPrompt)
+  const goals = await runJsonList(apiKey, userPrompt, numGoals)
 
   return {
     goals,
@@ -106,7 +137,7 @@ export async function generateProceduralGoals(
   numGoals: number = 5,
   extraContext: string = ''
 ): Promise<GeneratedGoals> {
-  const contextText = extraContext ? `Additional context: ${extraContext}` : ''
+  const contextText = contextLine(extraContext)
   const userPrompt = `${SYSTEM_PROCEDURAL}
 
 Generate ${numGoals} paraphrased expressions in ${nativeLanguage} for the situation: "${situationContent}".
@@ -125,7 +156,7 @@ ${contextText}
 
 Return JSON with a 'goals' array of strings.`
 
-  const goals = await runJsonList(apiKey, userPrompt)
+  const goals = await runJsonList(apiKey, userPrompt, numGoals)
 
   return {
     goals,
@@ -1,9 +1,30 @@
-import OpenAI from 'openai'
 import { logAi } from './aiLogger'
+import { getOpenAIClient } from './openaiClient'
 
 const MODEL_NAME = 'gpt-4o-mini'
 const TEMPERATURE = 0.2
 
+// Request shape is the same for every call; build it once
+const TRANSLATIONS_RESPONSE_FORMAT = {
+  type: 'json_schema',
+  json_schema: {
+    name: 'translations',
+    schema: {
+      type: 'object',
+      properties: {
+        translations: {
+          type: 'array',
+          items: { type: 'string' }
+        }
+      },
+      required: ['translations'],
+      additionalProperties: false
+    },
+    strict: true
+  }
+} as const
+const SYSTEM_MESSAGE = { role: 'system', content: 'Return JSON only.' } as const
+
 /**
  * Translate a gloss string into the other language (used for AI add flows in gloss modal)
  */
@@ -15,7 +36,7 @@ export async function translateGlosses(
 ): Promise<string[]> {
   const started = performance.now()
   if (!items.length) return []
-  const client = new OpenAI({ apiKey, dangerouslyAllowBrowser: true })
+  const client = getOpenAIClient(apiKey)
 
   const prompt = `Translate these expressions from ${sourceLang} to ${targetLang}. Return JSON { "translations": ["..."] } in the same order. Items:\n${items
     .map((i) => `- ${i}`)
@@ -26,27 +47,10 @@ export async function translateGlosses(
       model: MODEL_NAME,
       temperature: TEMPERATURE,
       messages: [
-        { role: 'system', content: 'Return JSON only.' },
+        SYSTEM_MESSAGE,
         { role: 'user', content: prompt }
       ],
-      response_format: {
-        type: 'json_schema',
-        json_schema: {
-          name: 'translations',
-          schema: {
-            type: 'object',
-            properties: {
-              translations: {
-                type: 'array',
-                items: { type: 'string' }
-              }
-            },
-            required: ['translations'],
-            additionalProperties: false
-          },
-          strict: true
-        }
-      }
+      response_format: TRANSLATIONS_RESPONSE_FORMAT
     })
 
     const content = response.choices[0]?.message?.content || '{}'
@@ -0,0 +1,41 @@
+import OpenAI from 'openai'
+
+// The SDK waits up to ten minutes by default. Short prompts answer in
+// seconds, so a stalled request fails (and is retried) much sooner; large
+// batches get time in proportion to the output they may produce
+const REQUEST_TIMEOUT_MS = 60_000
+const TIMEOUT_PER_OUTPUT_TOKEN_MS = 25
+// Timeouts are rounded up to this step so only a few clients are ever built
+const TIMEOUT_STEP_MS = 30_000
+
+let cachedKey: string | null = null
+const cachedClients = new Map<number, OpenAI>()
+
+/**
+ * Request timeout for a call that may produce up to `maxTokens` output tokens
+ */
+function requestTimeout(maxTokens?: number): number {
+  if (!maxTokens) return REQUEST_TIMEOUT_MS
+  const needed = REQUEST_TIMEOUT_MS + maxTokens * TIMEOUT_PER_OUTPUT_TOKEN_MS
+  return Math.ceil(needed / TIMEOUT_STEP_MS) * TIMEOUT_STEP_MS
+}
+
+/**
+ * Shared OpenAI client for the current API key, so consecutive calls reuse
+ * one client (and its keep-alive connections) instead of building a new one.
+ * Pass the request's output budget so long batches aren't cut off by the
+ * timeout and retried.
+ */
+export function getOpenAIClient(apiKey: string, maxTokens?: number): OpenAI {
+  if (cachedKey !== apiKey) {
+    cachedClients.clear()
+    cachedKey = apiKey
+  }
+  const timeout = requestTimeout(maxTokens)
+  let client = cachedClients.get(timeout)
+  if (!client) {
+    client = new OpenAI({ apiKey, dangerouslyAllowBrowser: true, timeout })
+    cachedClients.set(timeout, client)
+  }
+  return client
+}
@@ -2,9 +2,16 @@ export {
   SPLIT_LOG_MARKER,
   TRANSLATION_IMPOSSIBLE_MARKER,
   USAGE_IMPOSSIBLE_MARKER,
+  createTranslationLookup,
   detectGoalType,
   determineGoalState,
   evaluateGoalState,
+  glossRef,
+  goalTypeFor,
+  hasLog,
+  hasTag,
+  memoizeResolver,
+  normalizeLanguageCode,
   paraphraseDisplay
 } from '../../../shared/glosses/goalLogic'
-export type { GoalState } from '../../../shared/glosses/goalLogic'
+export type { GlossResolver, GoalEvaluation, GoalState, TranslationLookup } from '../../../shared/glosses/goalLogic'
@@ -1,46 +1,8 @@
-/**
- * Relationship rules ported from src/shared/storage.py
- */
-
-export const RELATIONSHIP_FIELDS = [
-  'morphologically_related',
-  'parts',
-  'has_similar_meaning',
-  'sounds_similar',
-  'usage_examples',
-  'to_be_differentiated_from',
-  'collocations',
-  'typical_follow_up',
-  'children',
-  'translations',
-  'notes',
-  'tags'
-] as const
-
-export const WITHIN_LANGUAGE_RELATIONS = new Set([
-  'morphologically_related',
-  'parts',
-  'has_similar_meaning',
-  'sounds_similar',
-  'usage_examples',
-  'to_be_differentiated_from',
-  'collocations',
-  'typical_follow_up'
-])
-
-export const CROSS_LANGUAGE_RELATIONS = new Set([
-  'translations',
-  'notes',
-  'tags',
-  'children'
-])
-
-export const SYMMETRICAL_RELATIONS = new Set([
-  'morphologically_related',
-  'has_similar_meaning',
-  'sounds_similar',
-  'to_be_differentiated_from',
-  'translations'
-])
-
-export type RelationshipField = typeof RELATIONSHIP_FIELDS[number]
+export {
+  CROSS_LANGUAGE_RELATIONS,
+  RELATIONSHIP_FIELDS,
+  SYMMETRICAL_RELATIONS,
+  WITHIN_LANGUAGE_RELATIONS,
+  isRelationshipField
+} from '../../../shared/glosses/relationRules'
+export type { RelationshipField } from '../../../shared/glosses/relationRules'
@@ -3,23 +3,28 @@
  */
 
 import type { Gloss } from '../../../main-process/storage/types'
-import type { GlossStorage } from '../../../main-process/storage/fsGlossStorage'
 import {
-  detectGoalType,
-  determineGoalState,
+  createTranslationLookup,
+  evaluateGoalState,
+  glossRef,
+  goalTypeFor,
+  hasLog,
+  hasTag,
+  normalizeLanguageCode,
   paraphraseDisplay,
   SPLIT_LOG_MARKER,
   TRANSLATION_IMPOSSIBLE_MARKER,
-  USAGE_IMPOSSIBLE_MARKER
+  USAGE_IMPOSSIBLE_MARKER,
+  type GlossResolver,
+  type GoalEvaluation,
+  type TranslationLookup
 } from './goalState'
 import type { RelationshipField } from './relationRules'
 
-function normalizeLanguageCode(code: string | null | undefined): string {
-  return (code || '').trim().toLowerCase()
-}
-
 export interface TreeNode {
   gloss: Gloss
+  /** `lang:slug` of the gloss, computed once when the node is built */
+  ref: string
   display: string
   children: TreeNode[]
   marker: string
@@ -54,40 +59,95 @@ export interface TreeStats {
   >
 }
 
-function glossKey(gl: Gloss): string {
-  return `${gl.language}:${gl.slug || gl.content}`
+type MissingKind = 'native' | 'target' | 'parts' | 'usage'
+type MissingField = 'native_missing' | 'target_missing' | 'parts_missing' | 'usage_missing'
+
+const MISSING_FIELDS: Record<MissingKind, MissingField> = {
+  native: 'native_missing',
+  target: 'target_missing',
+  parts: 'parts_missing',
+  usage: 'usage_missing'
 }
 
-function hasLog(gl: Gloss, marker: string): boolean {
-  const logs = gl.logs || {}
-  if (typeof logs !== 'object') return false
-  return Object.values(logs).some((val) => String(val).includes(marker))
+type NodeWarnings = Pick<
+  TreeNode,
+  'warn_native_missing' | 'warn_target_missing' | 'warn_usage_missing' | 'warn_parts_missing'
+>
+
+type NodeOptions = Partial<
+  Pick<TreeNode, 'marker' | 'bold' | 'state' | 'goal_type' | 'parentRef' | 'viaField'>
+>
+
+/**
+ * Create a tree node with every field initialized in the same order, so all
+ * nodes share one object shape no matter which role built them
+ */
+function createNode(gloss: Gloss, role: string, warnings: NodeWarnings, options: NodeOptions = {}): TreeNode {
+  return {
+    gloss,
+    ref: glossRef(gloss),
+    display: paraphraseDisplay(gloss),
+    children: [],
+    marker: options.marker ?? '',
+    bold: options.bold ?? false,
+    role,
+    warn_native_missing: warnings.warn_native_missing,
+    warn_target_missing: warnings.warn_target_missing,
+    warn_usage_missing: warnings.warn_usage_missing,
+    warn_parts_missing: warnings.warn_parts_missing,
+    state: options.state ?? '',
+    goal_type: options.goal_type,
+    parentRef: options.parentRef,
+    viaField: options.viaField
+  }
 }
 
 function translationExists(
-  storage: GlossStorage,
+  storage: GlossResolver,
+  translationsInto: TranslationLookup,
   gl: Gloss,
   lang: string,
   requireNonParaphrase: boolean = false
 ): boolean {
-  return (gl.translations || []).some((ref) => {
-    const [refLang] = ref.split(':')
-    if (normalizeLanguageCode(refLang) !== lang) return false
-    if (!requireNonParaphrase) return true
+  const refs = translationsInto(gl, lang)
+  if (!requireNonParaphrase) return refs.length > 0
+  return refs.some((ref) => {
     const tGloss = storage.resolveReference(ref)
     if (!tGloss) return false
-    return !(tGloss.tags || []).includes('eng:paraphrase')
+    return !hasTag(tGloss, 'eng:paraphrase')
   })
 }
 
+/**
+ * Resolve a situation's children once; callers building trees for several
+ * language pairs can hand the result to each buildGoalNodes call
+ */
+export function resolveSituationChildren(situation: Gloss, storage: GlossResolver): Gloss[] {
+  const glosses: Gloss[] = []
+  for (const ref of situation.children) {
+    const gloss = storage.resolveReference(ref)
+    if (gloss) glosses.push(gloss)
+  }
+  return glosses
+}
+
+/**
+ * Build goal trees for a situation. Pass `withLogs: false` when only the
+ * goal states are needed; `evaluations` then stays empty.
+ */
 export function buildGoalNodes(
   situation: Gloss,
-  storage: GlossStorage,
+  storage: GlossResolver,
   nativeLanguage: string,
-  targetLanguage: string
-): { nodes: TreeNode[]; stats: TreeStats } {
+  targetLanguage: string,
+  options: { children?: Gloss[]; withLogs?: boolean } = {}
+): { nodes: TreeNode[]; stats: TreeStats; evaluations: Record<string, GoalEvaluation> } {
   const native = normalizeLanguageCode(nativeLanguage)
   const target = normalizeLanguageCode(targetLanguage)
+  const children = options.children ?? resolveSituationChildren(situation, storage)
+  const withLogs = options.withLogs ?? true
+  // Scoped to this build, so glosses edited since the last one are re-read
+  const translationsInto = createTranslationLookup()
 
   const stats: TreeStats = {
     situation_glosses: new Set(),
@@ -112,16 +172,8 @@ export function buildGoalNodes(
     return stats.goal_missing_by_root[goalRef]
   }
 
-  type MissingField = 'native_missing' | 'target_missing' | 'parts_missing' | 'usage_missing'
-
-  function recordMissing(kind: 'native' | 'target' | 'parts' | 'usage', key: string, goalRef: string) {
-    const map: Record<typeof kind, MissingField> = {
-      native: 'native_missing',
-      target: 'target_missing',
-      parts: 'parts_missing',
-      usage: 'usage_missing'
-    }
-    const field = map[kind]
+  function recordMissing(kind: MissingKind, key: string, goalRef: string) {
+    const field = MISSING_FIELDS[kind]
     stats[field].add(key)
     ensureGoalStats(goalRef)[field].add(key)
   }
@@ -135,31 +187,36 @@ export function buildGoalNodes(
       checkParts?: boolean
       checkUsage?: boolean
     }
-  ): {
-    warn_native_missing: boolean
-    warn_target_missing: boolean
-    warn_usage_missing: boolean
-    warn_parts_missing: boolean
-  } {
-    const key = glossKey(gl)
+  ): NodeWarnings {
+    const key = glossRef(gl)
     stats.gloss_map[key] = gl
     stats.situation_glosses.add(key)
 
-    if (options.checkParts && !(gl.parts || []).length && !hasLog(gl, SPLIT_LOG_MARKER)) {
+    // A kind recorded here is known to be set; only look it up otherwise
+    // (the key may have been recorded earlier via another path)
+    let nativeMissing = false
+    let targetMissing = false
+    let partsMissing = false
+    let usageMissing = false
+
+    if (options.checkParts && !gl.parts.length && !hasLog(gl, SPLIT_LOG_MARKER)) {
       recordMissing('parts', key, goalRootRef)
+      partsMissing = true
     }
 
     if (options.checkTranslationTo) {
       const desiredLang = normalizeLanguageCode(options.checkTranslationTo)
       const missingTranslation =
-        !translationExists(storage, gl, desiredLang, options.requireNonParaphrase) &&
+        !translationExists(storage, translationsInto, gl, desiredLang, options.requireNonParaphrase) &&
         !hasLog(gl, `${TRANSLATION_IMPOSSIBLE_MARKER}:${desiredLang}`)
 
       if (missingTranslation) {
         if (desiredLang === native) {
           recordMissing('native', key, goalRootRef)
+          nativeMissing = true
         } else if (desiredLang === target) {
           recordMissing('target', key, goalRootRef)
+          targetMissing = true
         }
       }
     }
@@ -167,65 +224,44 @@ export function buildGoalNodes(
     if (
       options.checkUsage &&
       normalizeLanguageCode(gl.language) === target &&
-      !(gl.usage_examples || []).length &&
+      !gl.usage_examples.length &&
       !hasLog(gl, `${USAGE_IMPOSSIBLE_MARKER}:${target}`)
     ) {
       recordMissing('usage', key, goalRootRef)
+      usageMissing = true
     }
 
     return {
-      warn_native_missing: stats.native_missing.has(key),
-      warn_target_missing: stats.target_missing.has(key),
-      warn_usage_missing: stats.usage_missing.has(key),
-      warn_parts_missing: stats.parts_missing.has(key)
+      warn_native_missing: nativeMissing || stats.native_missing.has(key),
+      warn_target_missing: targetMissing || stats.target_missing.has(key),
+      warn_usage_missing: usageMissing || stats.usage_missing.has(key),
+      warn_parts_missing: partsMissing || stats.parts_missing.has(key)
     }
   }
 
   function addLearnable(gl: Gloss, learnLang: string, partsLine: boolean) {
     if (partsLine && normalizeLanguageCode(gl.language) === normalizeLanguageCode(learnLang)) {
-      stats.glosses_to_learn.add(glossKey(gl))
+      stats.glosses_to_learn.add(glossRef(gl))
     }
   }
 
   function buildTranslationNodes(
     gl: Gloss,
     otherLang: string,
-    path: Set<string>,
     goalRootRef: string,
     parentRef: string,
     viaField: RelationshipField,
     requireNonParaphrase: boolean = false
   ): TreeNode[] {
     const nodes: TreeNode[] = []
-    for (const ref of gl.translations || []) {
-      const [refLang] = ref.split(':')
-      if (normalizeLanguageCode(refLang) !== otherLang) continue
+    for (const ref of translationsInto(gl, otherLang)) {
       const tGloss = storage.resolveReference(ref)
       if (!tGloss) continue
-      if (requireNonParaphrase && (tGloss.tags || []).includes('eng:paraphrase')) continue
+      if (requireNonParaphrase && hasTag(tGloss, 'eng:paraphrase')) continue
 
       const warnings = computeWarnings(tGloss, goalRootRef, {})
-      const node: TreeNode = {
-        gloss: tGloss,
-        display: paraphraseDisplay(tGloss),
-        children: [],
-        marker: '',
-        bold: false,
-        role: 'translation',
-        warn_native_missing: warnings.warn_native_missing,
-        warn_target_missing: warnings.warn_target_missing,
-        warn_usage_missing: warnings.warn_usage_missing,
-        warn_parts_missing: warnings.warn_parts_missing,
-        state: '',
-        parentRef,
-        viaField
-      }
-
-      // Path-based cycle cut
-      if (!path.has(glossKey(tGloss))) {
-        // leave as leaf regardless
-      }
-      nodes.push(node)
+      // Translations are always leaves, so no cycle check is needed
+      nodes.push(createNode(tGloss, 'translation', warnings, { parentRef, viaField }))
     }
     return nodes
   }
@@ -244,36 +280,19 @@ export function buildGoalNodes(
       requireNonParaphrase: normalizeLanguageCode(uGloss.language) === native
     })
 
-    const node: TreeNode = {
-      gloss: uGloss,
-      display: paraphraseDisplay(uGloss),
-      children: [],
-      marker: '',
-      bold: false,
-      role: 'usage',
-      warn_native_missing: warnings.warn_native_missing,
-      warn_target_missing: warnings.warn_target_missing,
-      warn_usage_missing: warnings.warn_usage_missing,
-      warn_parts_missing: warnings.warn_parts_missing,
-      state: '',
-      parentRef,
-      viaField
-    }
+    const node = createNode(uGloss, 'usage', warnings, { parentRef, viaField })
 
-    if (path.has(glossKey(uGloss))) {
+    if (path.has(glossRef(uGloss))) {
       return node
     }
-    const nextPath = new Set(path)
-    nextPath.add(glossKey(uGloss))
 
     if (counterpart) {
       node.children.push(
         ...buildTranslationNodes(
           uGloss,
           counterpart,
-          nextPath,
           goalRootRef,
-          glossKey(uGloss),
+          glossRef(uGloss),
           'translations',
           normalizeLanguageCode(uGloss.language) === native
         )
@@ -291,9 +310,33 @@ export function buildGoalNodes(
     partsLine: boolean,
     options?: { skipUsageForNode?: boolean }
   ): TreeNode[] {
+    type Frame =
+      | { kind: 'visit'; partRef: string; parent: Gloss; out: TreeNode[]; skipUsage: boolean }
+      | { kind: 'leave'; key: string }
+
+    // Walk the parts with an explicit stack instead of recursing. Frames are
+    // pushed in reverse so parts are visited in order (depth first), and each
+    // expanded part queues a 'leave' frame below its children so `ancestors`
+    // always holds exactly the parts on the current branch.
     const nodes: TreeNode[] = []
-    for (const partRef of gl.parts || []) {
-      const partGloss = storage.resolveReference(partRef)
+    const ancestors = new Set(path)
+    const stack: Frame[] = []
+    const pushParts = (parent: Gloss, out: TreeNode[], skipUsage: boolean) => {
+      const refs = parent.parts
+      for (let i = refs.length - 1; i >= 0; i--) {
+        stack.push({ kind: 'visit', partRef: refs[i]!, parent, out, skipUsage })
+      }
+    }
+    pushParts(gl, nodes, Boolean(options?.skipUsageForNode))
+
+    while (stack.length) {
+      const frame = stack.pop()!
+      if (frame.kind === 'leave') {
+        ancestors.delete(frame.key)
+        continue
+      }
+
+      const partGloss = storage.resolveReference(frame.partRef)
       if (!partGloss) continue
 
       const lang = normalizeLanguageCode(partGloss.language)
@@ -302,41 +345,29 @@ export function buildGoalNodes(
         checkTranslationTo: counterpart || undefined,
         requireNonParaphrase: lang === native,
         checkParts: true,
-        checkUsage: !options?.skipUsageForNode && lang === target
+        checkUsage: !frame.skipUsage && lang === target
       })
 
-      const partKey = glossKey(partGloss)
-      const node: TreeNode = {
-        gloss: partGloss,
-        display: paraphraseDisplay(partGloss),
-        children: [],
-        marker: '',
+      const partKey = glossRef(partGloss)
+      const node = createNode(partGloss, 'part', warnings, {
         bold: partsLine && lang === normalizeLanguageCode(learnLang),
-        role: 'part',
-        warn_native_missing: warnings.warn_native_missing,
-        warn_target_missing: warnings.warn_target_missing,
-        warn_usage_missing: warnings.warn_usage_missing,
-        warn_parts_missing: warnings.warn_parts_missing,
-        state: '',
-        parentRef: glossKey(gl),
+        parentRef: glossRef(frame.parent),
         viaField: 'parts'
-      }
+      })
+      frame.out.push(node)
 
       addLearnable(partGloss, learnLang, partsLine)
 
-      if (path.has(partKey)) {
-        nodes.push(node)
-        continue
-      }
-      const nextPath = new Set(path)
-      nextPath.add(partKey)
+      // Path-based cycle cut: a part already on this branch stays a leaf
+      if (ancestors.has(partKey)) continue
+      ancestors.add(partKey)
+      stack.push({ kind: 'leave', key: partKey })
 
       if (counterpart) {
         node.children.push(
           ...buildTranslationNodes(
             partGloss,
             counterpart,
-            nextPath,
             goalRootRef,
             partKey,
             'translations',
@@ -345,27 +376,27 @@ export function buildGoalNodes(
         )
       }
 
-      if (!options?.skipUsageForNode && lang === target) {
-        for (const uRef of partGloss.usage_examples || []) {
+      if (!frame.skipUsage && lang === target) {
+        for (const uRef of partGloss.usage_examples) {
           const uGloss = storage.resolveReference(uRef)
           if (!uGloss) continue
-          node.children.push(buildUsageNode(uGloss, nextPath, goalRootRef, partKey, 'usage_examples'))
+          node.children.push(buildUsageNode(uGloss, ancestors, goalRootRef, partKey, 'usage_examples'))
         }
       }
 
-      node.children.push(...buildPartsNodes(partGloss, nextPath, goalRootRef, learnLang, partsLine))
-      nodes.push(node)
+      // Nested parts never skip usage, matching the top-level-only option
+      pushParts(partGloss, node.children, false)
     }
     return nodes
   }
 
   const nodes: TreeNode[] = []
+  // Root evaluations keyed by goal ref, so the UI can show the requirement
+  // log without evaluating the goal a second time
+  const evaluations: Record<string, GoalEvaluation> = {}
 
-  for (const ref of situation.children || []) {
-    const gloss = storage.resolveReference(ref)
-    if (!gloss) continue
-
-    const goalKind = detectGoalType(gloss, native, target)
+  for (const gloss of children) {
+    const goalKind = goalTypeFor(gloss, native, target)
     let marker = ''
     let learnLang = ''
     let goalType: 'procedural' | 'understanding' | undefined
@@ -382,8 +413,8 @@ export function buildGoalNodes(
       continue
     }
 
-    const rootKey = glossKey(gloss)
-    const goalRootRef = `${gloss.language}:${gloss.slug || gloss.content}`
+    const rootKey = glossRef(gloss)
+    const goalRootRef = rootKey
     const rootWarnings = computeWarnings(gloss, goalRootRef, {
       checkTranslationTo: goalKind === 'understanding' ? native : target,
       requireNonParaphrase: goalKind === 'procedural',
@@ -391,22 +422,16 @@ export function buildGoalNodes(
       checkUsage: false
     })
 
-    const rootNode: TreeNode = {
-      gloss,
-      display: paraphraseDisplay(gloss),
-      children: [],
+    const evaluation = evaluateGoalState(gloss, storage, native, target, { log: withLogs })
+    if (withLogs) evaluations[rootKey] = evaluation
+    const rootNode = createNode(gloss, 'root', rootWarnings, {
       marker,
       bold: true,
-      role: 'root',
-      warn_native_missing: rootWarnings.warn_native_missing,
-      warn_target_missing: rootWarnings.warn_target_missing,
-      warn_usage_missing: rootWarnings.warn_usage_missing,
-      warn_parts_missing: rootWarnings.warn_parts_missing,
-      state: determineGoalState(gloss, storage, native, target),
+      state: evaluation.state,
       goal_type: goalType,
-      parentRef: `${situation.language}:${situation.slug || situation.content}`,
+      parentRef: glossRef(situation),
       viaField: 'children'
-    }
+    })
 
     addLearnable(gloss, learnLang, true)
 
@@ -415,49 +440,36 @@ export function buildGoalNodes(
     if (goalKind === 'understanding') {
       // Root translations (leaf only)
       rootNode.children.push(
-        ...buildTranslationNodes(gloss, native, basePath, goalRootRef, rootKey, 'translations')
+        ...buildTranslationNodes(gloss, native, goalRootRef, rootKey, 'translations')
       )
       // Standard parts recursion starting at goal (skip usage on the root itself)
       rootNode.children.push(...buildPartsNodes(gloss, basePath, goalRootRef, learnLang, true))
     } else if (goalKind === 'procedural') {
       // Root translations to target, exclude paraphrase, each runs standard parts recursion
-      for (const tRef of gloss.translations || []) {
-        const [tLang] = tRef.split(':')
-        if (normalizeLanguageCode(tLang) !== target) continue
+      for (const tRef of translationsInto(gloss, target)) {
         const tGloss = storage.resolveReference(tRef)
         if (!tGloss) continue
-        if ((tGloss.tags || []).includes('eng:paraphrase')) continue
+        if (hasTag(tGloss, 'eng:paraphrase')) continue
 
         const tWarnings = computeWarnings(tGloss, goalRootRef, {
           checkTranslationTo: native,
           checkParts: true,
           checkUsage: true
         })
-        const tKey = glossKey(tGloss)
-        const transNode: TreeNode = {
-          gloss: tGloss,
-          display: paraphraseDisplay(tGloss),
-          children: [],
-          marker: '',
-          bold: false,
-          role: 'translation',
-          warn_native_missing: tWarnings.warn_native_missing,
-          warn_target_missing: tWarnings.warn_target_missing,
-          warn_usage_missing: tWarnings.warn_usage_missing,
-          warn_parts_missing: tWarnings.warn_parts_missing,
-          state: '',
+        const tKey = glossRef(tGloss)
+        const transNode = createNode(tGloss, 'translation', tWarnings, {
           parentRef: rootKey,
           viaField: 'translations'
-        }
+        })
 
         const branchPath = new Set<string>([rootKey, tKey])
         // Show translations back to native (leaf)
         transNode.children.push(
-          ...buildTranslationNodes(tGloss, native, branchPath, goalRootRef, tKey, 'translations')
+          ...buildTranslationNodes(tGloss, native, goalRootRef, tKey, 'translations')
         )
         // Usage + parts recursion
         if (normalizeLanguageCode(tGloss.language) === target) {
-          for (const uRef of tGloss.usage_examples || []) {
+          for (const uRef of tGloss.usage_examples) {
             const uGloss = storage.resolveReference(uRef)
             if (!uGloss) continue
             transNode.children.push(buildUsageNode(uGloss, branchPath, goalRootRef, tKey, 'usage_examples'))
@@ -473,7 +485,7 @@ export function buildGoalNodes(
       }
 
       // Root parts, if present, also follow standard parts recursion
-      if ((gloss.parts || []).length) {
+      if (gloss.parts.length) {
         rootNode.children.push(
           ...buildPartsNodes(gloss, basePath, goalRootRef, learnLang, true, { skipUsageForNode: false })
         )
@@ -483,5 +495,5 @@ export function buildGoalNodes(
     nodes.push(rootNode)
   }
 
-  return { nodes, stats }
+  return { nodes, stats, evaluations }
 }
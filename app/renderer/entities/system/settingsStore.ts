@@ -33,10 +33,13 @@ export async function initSettings(): Promise<void> {
   }
 
   try {
-    const native = await window.electronAPI.settings.get<string>('nativeLanguage')
-    const target = await window.electronAPI.settings.get<string>('targetLanguage')
-    const lastSit = await window.electronAPI.settings.get<string>('lastSituationRef')
-    const apiKey = await window.electronAPI.settings.get<string>('openaiApiKey')
+    // Independent reads; fetch them in parallel instead of one round trip each
+    const [native, target, lastSit, apiKey] = await Promise.all([
+      window.electronAPI.settings.get<string>('nativeLanguage'),
+      window.electronAPI.settings.get<string>('targetLanguage'),
+      window.electronAPI.settings.get<string>('lastSituationRef'),
+      window.electronAPI.settings.get<string>('openaiApiKey')
+    ])
 
     settings.value = {
       nativeLanguage: native || null,
@@ -92,10 +95,12 @@ export function useSettings() {
         lastSituationRef: null,
         openaiApiKey: null
       }
-      await window.electronAPI.settings.set('nativeLanguage', null)
-      await window.electronAPI.settings.set('targetLanguage', null)
-      await window.electronAPI.settings.set('lastSituationRef', null)
-      await window.electronAPI.settings.set('openaiApiKey', null)
+      await Promise.all([
+        window.electronAPI.settings.set('nativeLanguage', null),
+        window.electronAPI.settings.set('targetLanguage', null),
+        window.electronAPI.settings.set('lastSituationRef', null),
+        window.electronAPI.settings.set('openaiApiKey', null)
+      ])
     }
   }
 }
@@ -1,25 +1,117 @@
 import { Agent, run } from '@openai/agents'
 import { OpenAIChatCompletionsModel } from '@openai/agents-openai'
-import OpenAI from 'openai'
+import type OpenAI from 'openai'
 import type { Gloss } from '../../../main-process/storage/types'
 import { loadLanguages } from '../../entities/languages/loader'
 import { logAi } from '../../entities/ai/aiLogger'
+import { getOpenAIClient } from '../../entities/ai/openaiClient'
+import { paraphraseDisplay } from '../../entities/glosses/goalState'
 
 const MODEL = 'gpt-4o-mini'
 const TEMP_TRANSLATION = 0.2
 const TEMP_GENERATION = 0.2
 const TEMP_JUDGE = 0.0
+// Glosses per prompt, and how many prompts may be in flight at once
+const BATCH_SIZE = {
+  translation: 25,
+  parts: 20,
+  usage: 20
+} as const
+const MAX_CONCURRENT_BATCHES = 4
+// Cap on requests in flight across all runs (translation directions,
+// judge + generation pairs, the gloss modal), so bursts queue up here
+// instead of running into the API's rate limit and its retry backoff
+const MAX_IN_FLIGHT_REQUESTS = 6
+let requestsInFlight = 0
+const requestQueue: Array<() => void> = []
+
+// Output token budgets: a fixed allowance for the JSON wrapper plus a
+// per-item share, so small batches don't reserve room for long answers
+const TOKENS_BASE = 64
+const TOKENS_PER_ITEM = {
+  translation: 200,
+  parts: 120,
+  usage: 120
+} as const
+// The judge echoes every source text back, so its budget follows the content
+// length (at most about one token per character) plus room for the verdict
+const JUDGE_TOKENS_PER_ITEM = 24
+
+// Completions are a pure function of model, prompt and settings, so repeated
+// prompts (re-runs after a cancel, overlapping situations) reuse the answer
+const RESPONSE_CACHE_LIMIT = 500
+const responseCache = new Map<string, Promise<string>>()
+
+// Completed responses are also kept across sessions, most recent last
+const STORED_RESPONSES_KEY = 'aiResponseCache'
+const STORED_RESPONSES_LIMIT = 200
+const storedResponses = loadStoredResponses()
+
+function loadStoredResponses(): Map<string, string> {
+  try {
+    const raw = localStorage.getItem(STORED_RESPONSES_KEY)
+    const entries = raw ? (JSON.parse(raw) as Array<[string, string]>) : []
+    // Drop empty answers stored before they were excluded
+    return new Map(entries.filter(([, content]) => isReusableResponse(content)))
+  } catch {
+    return new Map()
+  }
+}
+
+/**
+ * Whether a response is worth reusing: valid JSON with at least one item.
+ * Malformed answers would fail every later run too, and empty ones would
+ * keep returning no suggestions for the same prompt.
+ */
+function isReusableResponse(content: string): boolean {
+  try {
+    const parsed = JSON.parse(content)
+    return Array.isArray(parsed?.items) && parsed.items.length > 0
+  } catch {
+    return false
+  }
+}
+
+function storeResponse(key: string, content: string) {
+  storedResponses.delete(key)
+  storedResponses.set(key, content)
+  while (storedResponses.size > STORED_RESPONSES_LIMIT) {
+    storedResponses.delete(storedResponses.keys().next().value!)
+  }
+  try {
+    localStorage.setItem(STORED_RESPONSES_KEY, JSON.stringify([...storedResponses]))
+  } catch (err) {
+    console.warn('Failed to persist AI response cache', err)
+  }
+}
+
+function outputBudget(kind: keyof typeof TOKENS_PER_ITEM, items: number): number {
+  return TOKENS_BASE + TOKENS_PER_ITEM[kind] * items
+}
+
+function judgeBudget(glosses: Gloss[]): number {
+  return glosses.reduce((sum, g) => sum + g.content.length + JUDGE_TOKENS_PER_ITEM, TOKENS_BASE)
+}
 
 type TranslationMode = 'toNative' | 'toTarget' | 'paraphraseToTarget'
 
 export interface Suggestion {
   glossRef: string
+  // Display label of the source gloss, from the gloss already resolved for
+  // the prompt so callers don't have to look it up again
+  glossLabel: string
   suggestions: string[]
 }
 
 interface GenerationOptions {
   context?: string
   count?: number
+  // Called with each batch's suggestions as soon as that batch completes
+  onBatch?: (suggestions: Suggestion[]) => void
+  // Called with the number of refs in each finished batch
+  onProgress?: (completedRefs: number) => void
+  // Ask the model again instead of reusing cached answers for the same prompt
+  fresh?: boolean
 }
 
 async function getAiNote(language: string): Promise<string | null> {
@@ -29,12 +121,16 @@ async function getAiNote(language: string): Promise<string | null> {
 }
 
 async function fetchGlosses(refs: string[]): Promise<Gloss[]> {
-  const results: Gloss[] = []
-  for (const ref of refs.slice(0, 50)) {
-    const g = await window.electronAPI.gloss.resolveRef(ref)
-    if (g) results.push(g)
-  }
-  return results
+  const resolved = await window.electronAPI.gloss.resolveRefs(refs)
+  return resolved.filter((g): g is Gloss => g !== null)
+}
+
+/**
+ * Prompt item list with repeated lines dropped; answers are keyed by
+ * content, so glosses sharing a content all pick up the same result
+ */
+function bulletList(lines: string[]): string {
+  return [...new Set(lines)].map((line) => `- ${line}`).join('\n')
 }
 
 function translationPrompt(
@@ -45,22 +141,15 @@ function translationPrompt(
   aiNote: string | null,
   options?: GenerationOptions
 ) {
-  const bullets = glosses.map((g) => `- ${g.content}`).join('\n')
+  const bullets = bulletList(glosses.map((g) => g.content))
   const count = options?.count ?? 2
   const contextLine = options?.context ? `${options.context}\n\n` : ''
   const aiNoteText = aiNote ? `Language notes: ${aiNote}\n\n` : ''
 
   if (mode === 'paraphraseToTarget') {
-    return `${contextLine}${aiNoteText}You are a specialized language assistant for translating communicative goals (paraphrases) into actual expressions.
-
-CRITICAL: The input is NOT a phrase to translate literally. It is a COMMUNICATIVE GOAL describing what a learner wants to express.
-
-Your task:
-- Find the ACTUAL ways native speakers would EXPRESS this goal in the target language (${target})
-- Return real phrases/expressions, NOT literal word-for-word translations
-- Include usage notes ONLY when expressions have important context differences
-
-Provide ${count} expressions for each item.
+    return `${contextLine}${aiNoteText}Each item is a communicative goal, NOT a phrase to translate literally.
+Give ${count} expressions native ${target} speakers actually use to express it.
+Add a usage note only when expressions differ in important context.
 
 Items:
 ${bullets}
@@ -88,20 +177,12 @@ Return JSON { "items": [ { "source": "<content>", "translations": [ {"text": str
 }
 
 function partsPrompt(glosses: Gloss[], aiNote: string | null, options?: GenerationOptions) {
-  const bullets = glosses.map((g) => `- ${g.content}`).join('\n')
+  const bullets = bulletList(glosses.map((g) => g.content))
   const contextLine = options?.context ? `${options.context}\n\n` : ''
   const aiNoteText = aiNote ? `Language notes: ${aiNote}\n\n` : ''
-  return `${contextLine}${aiNoteText}You are a concise linguistic decomposition assistant.
-
-Break expressions into learnable component parts - words or meaningful sub-expressions.
-
-Take each expression below and break it up into parts that can be learned on their own.
-Each returned item must be a meaningful standalone item.
-If an input cannot be split into meaningful part, return an empty array for this item.
-
-Do not return meaningless parts such as punctuation symbol or syllables with no inherent meaning.
-
-Return JSON with 'parts' array for each source.
+  return `${contextLine}${aiNoteText}Split each expression into parts that can be learned on their own: words or meaningful sub-expressions.
+Never return punctuation, letters or syllables with no own meaning.
+Single words and other unsplittable inputs get an empty parts array.
 
 Items:
 ${bullets}
@@ -110,16 +191,11 @@ Return JSON { "items": [ { "source": "<content>", "parts": ["..."] } ] }`
 }
 
 function usagePrompt(glosses: Gloss[], aiNote: string | null, options?: GenerationOptions) {
-  const bullets = glosses.map((g) => `- ${g.content} (${g.language})`).join('\n')
+  const bullets = bulletList(glosses.map((g) => `${g.content} (${g.language})`))
   const count = options?.count ?? 2
   const contextLine = options?.context ? `${options.context}\n\n` : ''
   const aiNoteText = aiNote ? `Language notes: ${aiNote}\n\n` : ''
-  return `${contextLine}${aiNoteText}You generate concise usage example sentences for language learning.
-
-Create natural, practical sentences that demonstrate how the word or phrase is used in context.
-Prefer short sentences, 3-5 words is ideal.
-
-Generate ${count} example sentences that use the word/phrase.
+  return `${contextLine}${aiNoteText}Write ${count} short, natural example sentences (3-5 words is ideal) using each word or phrase.
 
 Items:
 ${bullets}
@@ -127,24 +203,8 @@ ${bullets}
 Return JSON { "items": [ { "source": "<content>", "usages": ["..."] } ] }`
 }
 
-function splitJudgePrompt(glosses: Gloss[]) {
-  const bullets = glosses.map((g) => `- ${g.content}`).join('\n')
-  return `You judge if expressions can be split into learnable parts.
-
-Single words CANNOT be split and should return false!
-Do not return true if all a word can be split into is letters or syllables with no own meaning.
-Multi-word phrases or expressions can be split into component words or sub-expressions (true).
-
-For each gloss below, judge true/false.
-
-Glosses:
-${bullets}
-
-Return JSON { "items": [ { "source": "<content>", "splittable": true/false } ] }`
-}
-
 function usageJudgePrompt(glosses: Gloss[]) {
-  const bullets = glosses.map((g) => `- ${g.content} (${g.language})`).join('\n')
+  const bullets = bulletList(glosses.map((g) => `${g.content} (${g.language})`))
   return `You judge whether glosses are suitable for usage examples.
 
 Words and short phrases can usefully be demonstrated in example sentences.
@@ -158,24 +218,101 @@ ${bullets}
 Return JSON { "items": [ { "source": "<content>", "ok": true/false } ] }`
 }
 
-async function runJsonAgent(apiKey: string, prompt: string, temperature: number): Promise<string> {
-  const client = new OpenAI({ apiKey, dangerouslyAllowBrowser: true })
-  const agent = new Agent({
-    name: 'json-runner',
-    instructions: 'Return ONLY valid JSON matching the user request. No prose.',
-    model: new OpenAIChatCompletionsModel(client, MODEL),
-    modelSettings: { temperature }
-  })
-  const result = await run(agent, prompt)
+function runJsonAgent(
+  apiKey: string,
+  prompt: string,
+  temperature: number,
+  maxTokens: number,
+  fresh = false
+): Promise<string> {
+  const key = JSON.stringify([MODEL, temperature, maxTokens, prompt])
+  const cached = fresh ? undefined : responseCache.get(key)
+  if (cached) return cached
+  const stored = fresh ? undefined : storedResponses.get(key)
+  const pending: Promise<string> = stored !== undefined
+    ? Promise.resolve(stored)
+    : requestJson(apiKey, prompt, temperature, maxTokens).then((content) => {
+      // A fresh answer replaces the cached one; unusable ones aren't kept
+      if (isReusableResponse(content)) storeResponse(key, content)
+      else if (responseCache.get(key) === pending) responseCache.delete(key)
+      return content
+    })
+  responseCache.set(key, pending)
+  if (responseCache.size > RESPONSE_CACHE_LIMIT) {
+    responseCache.delete(responseCache.keys().next().value!)
+  }
+  // Failures are not cached, so a retry goes back to the API
+  pending.catch(() => responseCache.delete(key))
+  return pending
+}
+
+// Agents per client and settings; only a handful of temperature and
+// token-budget combinations occur, so they are built once and reused
+const jsonAgents = new WeakMap<OpenAI, Map<string, Agent>>()
+
+function jsonAgent(client: OpenAI, temperature: number, maxTokens: number): Agent {
+  let agents = jsonAgents.get(client)
+  if (!agents) {
+    agents = new Map()
+    jsonAgents.set(client, agents)
+  }
+  const key = `${temperature}|${maxTokens}`
+  let agent = agents.get(key)
+  if (!agent) {
+    agent = new Agent({
+      name: 'json-runner',
+      instructions: 'Return ONLY valid JSON matching the user request. No prose.',
+      model: new OpenAIChatCompletionsModel(client, MODEL),
+      modelSettings: { temperature, maxTokens }
+    })
+    agents.set(key, agent)
+  }
+  return agent
+}
+
+async function withRequestSlot<T>(task: () => Promise<T>): Promise<T> {
+  if (requestsInFlight < MAX_IN_FLIGHT_REQUESTS) {
+    requestsInFlight++
+  } else {
+    // The finishing request hands its slot straight to us
+    await new Promise<void>((resolve) => requestQueue.push(resolve))
+  }
+  try {
+    return await task()
+  } finally {
+    const next = requestQueue.shift()
+    if (next) next()
+    else requestsInFlight--
+  }
+}
+
+async function requestJson(
+  apiKey: string,
+  prompt: string,
+  temperature: number,
+  maxTokens: number
+): Promise<string> {
+  const agent = jsonAgent(getOpenAIClient(apiKey, maxTokens), temperature, maxTokens)
+  const result = await withRequestSlot(() => run(agent, prompt))
+  // Output that used the whole budget stopped on the length limit
+  // (finish_reason 'length'); its JSON is cut off, so say so plainly
+  // instead of failing later with a parse error
+  const lastResponse = result.rawResponses[result.rawResponses.length - 1]
+  const outputTokens = lastResponse?.usage.outputTokens ?? 0
+  if (outputTokens >= maxTokens) {
+    throw new Error(`AI response was cut off at the ${maxTokens}-token output limit`)
+  }
   return (result.finalOutput ?? '').toString().trim()
 }
 
 async function runCompletion(
   apiKey: string,
   prompt: string,
-  temperature: number
+  temperature: number,
+  maxTokens: number,
+  fresh = false
 ): Promise<Record<string, string[]>> {
-  const content = (await runJsonAgent(apiKey, prompt, temperature)) || '{}'
+  const content = (await runJsonAgent(apiKey, prompt, temperature, maxTokens, fresh)) || '{}'
   const parsed = JSON.parse(content)
   const items = parsed.items || []
   const map = new Map<string, string[]>()
@@ -200,15 +337,15 @@ async function runCompletion(
   return Object.fromEntries(map)
 }
 
-async function runJudge(apiKey: string, prompt: string): Promise<Set<string>> {
-  const content = (await runJsonAgent(apiKey, prompt, TEMP_JUDGE)) || '{}'
+async function runJudge(apiKey: string, prompt: string, maxTokens: number): Promise<Set<string>> {
+  const content = (await runJsonAgent(apiKey, prompt, TEMP_JUDGE, maxTokens)) || '{}'
   const parsed = JSON.parse(content)
   const items = parsed.items || parsed || []
   const okSet = new Set<string>()
   if (Array.isArray(items)) {
     for (const item of items) {
       const source = String(item.source || '').trim()
-      const decision = item.splittable === true || item.ok === true
+      const decision = item.ok === true
       if (source && decision) {
         okSet.add(source)
       }
@@ -223,6 +360,53 @@ async function runJudge(apiKey: string, prompt: string): Promise<Set<string>> {
   return okSet
 }
 
+/**
+ * Log a marker on each gloss with one bulk call per distinct marker
+ */
+async function markGlosses(glosses: Gloss[], markerFor: (gloss: Gloss) => string): Promise<void> {
+  const refsByMarker = new Map<string, string[]>()
+  for (const gloss of glosses) {
+    const marker = markerFor(gloss)
+    const refs = refsByMarker.get(marker)
+    const ref = `${gloss.language}:${gloss.slug}`
+    if (refs) refs.push(ref)
+    else refsByMarker.set(marker, [ref])
+  }
+  for (const [marker, refs] of refsByMarker) {
+    await window.electronAPI.gloss.markLogs(refs, marker)
+  }
+}
+
+/**
+ * Split refs into prompt-sized batches and run them with bounded
+ * concurrency; results keep the order of the input refs
+ */
+async function inBatches(
+  refs: string[],
+  size: number,
+  runBatch: (batch: string[]) => Promise<Suggestion[]>,
+  options?: GenerationOptions
+): Promise<Suggestion[]> {
+  const batches: string[][] = []
+  for (let i = 0; i < refs.length; i += size) {
+    batches.push(refs.slice(i, i + size))
+  }
+  const results: Suggestion[][] = new Array(batches.length)
+  let next = 0
+  async function worker() {
+    while (next < batches.length) {
+      const index = next++
+      const batch = batches[index]!
+      const suggestions = await runBatch(batch)
+      results[index] = suggestions
+      if (suggestions.length) options?.onBatch?.(suggestions)
+      options?.onProgress?.(batch.length)
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(MAX_CONCURRENT_BATCHES, batches.length) }, worker))
+  return results.flat()
+}
+
 function mapSuggestions(glosses: Gloss[], bag: Record<string, string[]>): Suggestion[] {
   const res: Suggestion[] = []
   for (const g of glosses) {
@@ -230,6 +414,7 @@ function mapSuggestions(glosses: Gloss[], bag: Record<string, string[]>): Sugges
     if (vals.length) {
       res.push({
         glossRef: `${g.language}:${g.slug}`,
+        glossLabel: paraphraseDisplay(g),
         suggestions: vals
       })
     }
@@ -237,6 +422,55 @@ function mapSuggestions(glosses: Gloss[], bag: Record<string, string[]>): Sugges
   return res
 }
 
+/**
+ * Glosses the model returned nothing for; mapSuggestions only keeps
+ * non-empty answers, so these are the refs missing from the result
+ */
+function withoutSuggestions(glosses: Gloss[], suggestions: Suggestion[]): Gloss[] {
+  const answered = new Set(suggestions.map((s) => s.glossRef))
+  return glosses.filter((g) => !answered.has(`${g.language}:${g.slug}`))
+}
+
+async function logSuggestions(
+  action: string,
+  refs: string[],
+  prompt: string,
+  suggestions: Suggestion[],
+  started: number,
+  extra: Record<string, unknown> = {}
+) {
+  await logAi(action, refs, {
+    ...extra,
+    promptLength: prompt.length,
+    suggestionSets: suggestions.length,
+    totalSuggestions: suggestions.reduce((acc, s) => acc + s.suggestions.length, 0),
+    suggestions: suggestions.map((s) => ({
+      ref: s.glossRef,
+      count: s.suggestions.length,
+      suggestions: s.suggestions
+    })),
+    durationMs: Math.round(performance.now() - started)
+  })
+}
+
+/**
+ * Log a failed batch and rethrow, so the caller still sees the error
+ */
+async function logBatchError(
+  action: string,
+  refs: string[],
+  err: unknown,
+  started: number,
+  extra: Record<string, unknown> = {}
+): Promise<never> {
+  await logAi(action, refs, {
+    ...extra,
+    error: err instanceof Error ? err.message : String(err),
+    durationMs: Math.round(performance.now() - started)
+  })
+  throw err
+}
+
 export async function generateTranslations(
   apiKey: string,
   mode: TranslationMode,
@@ -244,58 +478,53 @@ export async function generateTranslations(
   native: string,
   target: string,
   options?: GenerationOptions
+): Promise<Suggestion[]> {
+  return inBatches(
+    refs,
+    BATCH_SIZE.translation,
+    (batch) => generateTranslationsBatch(apiKey, mode, batch, native, target, options),
+    options
+  )
+}
+
+async function generateTranslationsBatch(
+  apiKey: string,
+  mode: TranslationMode,
+  refs: string[],
+  native: string,
+  target: string,
+  options?: GenerationOptions
 ): Promise<Suggestion[]> {
   const started = performance.now()
   if (!refs.length) return []
   try {
-    const glosses = await fetchGlosses(refs.slice(0, 25))
+    const glosses = await fetchGlosses(refs)
     if (!glosses.length) return []
     const note =
       mode === 'toNative'
         ? await getAiNote(native)
         : await getAiNote(target)
     const prompt = translationPrompt(mode, glosses, native, target, note, options)
-    const bag = await runCompletion(apiKey, prompt, TEMP_TRANSLATION)
+    const bag = await runCompletion(
+      apiKey,
+      prompt,
+      TEMP_TRANSLATION,
+      outputBudget('translation', glosses.length),
+      options?.fresh
+    )
     const suggestions = mapSuggestions(glosses, bag)
 
-    // Find glosses that got no translations
-    const glossesWithoutTranslations = glosses.filter(g => {
-      const ref = `${g.language}:${g.slug}`
-      return !suggestions.some(s => s.glossRef === ref && s.suggestions.length > 0)
-    })
-
-    // Determine target language
+    // Mark glosses without translations as impossible to translate
     const targetLang = mode === 'toNative' ? native : target
+    await markGlosses(
+      withoutSuggestions(glosses, suggestions),
+      () => `TRANSLATION_CONSIDERED_IMPOSSIBLE:${targetLang}`
+    )
 
-    // Mark each one as impossible to translate
-    for (const gloss of glossesWithoutTranslations) {
-      await window.electronAPI.gloss.markLog(
-        `${gloss.language}:${gloss.slug}`,
-        `TRANSLATION_CONSIDERED_IMPOSSIBLE:${targetLang}`
-      )
-    }
-
-    const suggestionDetails = suggestions.map((s) => ({
-      ref: s.glossRef,
-      count: s.suggestions.length,
-      suggestions: s.suggestions
-    }))
-    await logAi('generateTranslations', refs, {
-      mode,
-      promptLength: prompt.length,
-      suggestionSets: suggestions.length,
-      totalSuggestions: suggestions.reduce((acc, s) => acc + s.suggestions.length, 0),
-      suggestions: suggestionDetails,
-      durationMs: Math.round(performance.now() - started)
-    })
+    await logSuggestions('generateTranslations', refs, prompt, suggestions, started, { mode })
     return suggestions
   } catch (err) {
-    await logAi('generateTranslationsError', refs, {
-      mode,
-      error: err instanceof Error ? err.message : String(err),
-      durationMs: Math.round(performance.now() - started)
-    })
-    throw err
+    return logBatchError('generateTranslationsError', refs, err, started, { mode })
   }
 }
 
@@ -303,67 +532,48 @@ export async function generateParts(
   apiKey: string,
   refs: string[],
   options?: GenerationOptions
+): Promise<Suggestion[]> {
+  return inBatches(
+    refs,
+    BATCH_SIZE.parts,
+    (batch) => generatePartsBatch(apiKey, batch, options),
+    options
+  )
+}
+
+async function generatePartsBatch(
+  apiKey: string,
+  refs: string[],
+  options?: GenerationOptions
 ): Promise<Suggestion[]> {
   const started = performance.now()
   if (!refs.length) return []
   try {
-    const glosses = await fetchGlosses(refs.slice(0, 20))
+    const glosses = await fetchGlosses(refs)
     if (!glosses.length) return []
-    const judgeOk = await runJudge(apiKey, splitJudgePrompt(glosses))
-    const rejected = glosses.filter((g) => !judgeOk.has(g.content))
-    await logAi('generateParts.judge', refs, {
-      okRefs: glosses.filter((g) => judgeOk.has(g.content)).map((g) => `${g.language}:${g.slug}`),
-      rejectedRefs: rejected.map((g) => `${g.language}:${g.slug}`),
-      durationMs: Math.round(performance.now() - started)
-    })
-    for (const gloss of rejected) {
-      await window.electronAPI.gloss.markLog(
-        `${gloss.language}:${gloss.slug}`,
-        'SPLIT_CONSIDERED_UNNECESSARY'
-      )
-    }
-    const filtered = glosses.filter((g) => judgeOk.has(g.content))
-    if (!filtered.length) return []
-    const aiNote = await getAiNote(filtered[0].language)
-    const prompt = partsPrompt(filtered, aiNote, options)
-    const bag = await runCompletion(apiKey, prompt, TEMP_GENERATION)
-    const suggestions = mapSuggestions(filtered, bag)
+    // One call both decides splittability and splits: an empty parts
+    // array is the "cannot be split" answer
+    const aiNote = await getAiNote(glosses[0].language)
+    const prompt = partsPrompt(glosses, aiNote, options)
+    const bag = await runCompletion(
+      apiKey,
+      prompt,
+      TEMP_GENERATION,
+      outputBudget('parts', glosses.length),
+      options?.fresh
+    )
+    const suggestions = mapSuggestions(glosses, bag)
 
-    // Find glosses that got no parts from LLM
-    const glossesWithoutParts = filtered.filter(g => {
-      const ref = `${g.language}:${g.slug}`
-      return !suggestions.some(s => s.glossRef === ref && s.suggestions.length > 0)
-    })
+    // Glosses that got no parts from LLM
+    const unsplittable = withoutSuggestions(glosses, suggestions)
+    await markGlosses(unsplittable, () => 'SPLIT_CONSIDERED_UNNECESSARY')
 
-    // Mark each one
-    for (const gloss of glossesWithoutParts) {
-      await window.electronAPI.gloss.markLog(
-        `${gloss.language}:${gloss.slug}`,
-        'SPLIT_CONSIDERED_UNNECESSARY'
-      )
-    }
-
-    const suggestionDetails = suggestions.map((s) => ({
-      ref: s.glossRef,
-      count: s.suggestions.length,
-      suggestions: s.suggestions
-    }))
-    await logAi('generateParts', refs, {
-      judgedOk: filtered.length,
-      rejected: rejected.length,
-      promptLength: prompt.length,
-      suggestionSets: suggestions.length,
-      totalSuggestions: suggestions.reduce((acc, s) => acc + s.suggestions.length, 0),
-      suggestions: suggestionDetails,
-      durationMs: Math.round(performance.now() - started)
+    await logSuggestions('generateParts', refs, prompt, suggestions, started, {
+      unsplittable: unsplittable.length
     })
     return suggestions
   } catch (err) {
-    await logAi('generatePartsError', refs, {
-      error: err instanceof Error ? err.message : String(err),
-      durationMs: Math.round(performance.now() - started)
-    })
-    throw err
+    return logBatchError('generatePartsError', refs, err, started)
   }
 }
 
@@ -371,66 +581,54 @@ export async function generateUsage(
   apiKey: string,
   refs: string[],
   options?: GenerationOptions
+): Promise<Suggestion[]> {
+  return inBatches(
+    refs,
+    BATCH_SIZE.usage,
+    (batch) => generateUsageBatch(apiKey, batch, options),
+    options
+  )
+}
+
+async function generateUsageBatch(
+  apiKey: string,
+  refs: string[],
+  options?: GenerationOptions
 ): Promise<Suggestion[]> {
   const started = performance.now()
   if (!refs.length) return []
   try {
-    const glosses = await fetchGlosses(refs.slice(0, 20))
+    const glosses = await fetchGlosses(refs)
     if (!glosses.length) return []
-    const judgeOk = await runJudge(apiKey, usageJudgePrompt(glosses))
+    // Generate usages speculatively while the judge runs; the judge only
+    // decides which answers are kept, so the two calls overlap
+    const aiNote = await getAiNote(glosses[0].language)
+    const prompt = usagePrompt(glosses, aiNote, options)
+    const [judgeOk, bag] = await Promise.all([
+      runJudge(apiKey, usageJudgePrompt(glosses), judgeBudget(glosses)),
+      runCompletion(apiKey, prompt, TEMP_GENERATION, outputBudget('usage', glosses.length), options?.fresh)
+    ])
     const rejected = glosses.filter((g) => !judgeOk.has(g.content))
     await logAi('generateUsage.judge', refs, {
       okRefs: glosses.filter((g) => judgeOk.has(g.content)).map((g) => `${g.language}:${g.slug}`),
       rejectedRefs: rejected.map((g) => `${g.language}:${g.slug}`),
       durationMs: Math.round(performance.now() - started)
     })
-    for (const gloss of rejected) {
-      await window.electronAPI.gloss.markLog(
-        `${gloss.language}:${gloss.slug}`,
-        `USAGE_EXAMPLE_CONSIDERED_IMPOSSIBLE:${gloss.language}`
-      )
-    }
     const filtered = glosses.filter((g) => judgeOk.has(g.content))
-    if (!filtered.length) return []
-    const aiNote = await getAiNote(filtered[0].language)
-    const prompt = usagePrompt(filtered, aiNote, options)
-    const bag = await runCompletion(apiKey, prompt, TEMP_GENERATION)
     const suggestions = mapSuggestions(filtered, bag)
 
-    // Find glosses that got no usage examples from LLM
-    const glossesWithoutUsage = filtered.filter(g => {
-      const ref = `${g.language}:${g.slug}`
-      return !suggestions.some(s => s.glossRef === ref && s.suggestions.length > 0)
-    })
-
-    // Mark each one
-    for (const gloss of glossesWithoutUsage) {
-      await window.electronAPI.gloss.markLog(
-        `${gloss.language}:${gloss.slug}`,
-        `USAGE_EXAMPLE_CONSIDERED_IMPOSSIBLE:${gloss.language}`
-      )
-    }
+    // Rejected glosses and those that got no usage examples share a marker
+    await markGlosses(
+      [...rejected, ...withoutSuggestions(filtered, suggestions)],
+      (gloss) => `USAGE_EXAMPLE_CONSIDERED_IMPOSSIBLE:${gloss.language}`
+    )
 
-    const suggestionDetails = suggestions.map((s) => ({
-      ref: s.glossRef,
-      count: s.suggestions.length,
-      suggestions: s.suggestions
-    }))
-    await logAi('generateUsage', refs, {
+    await logSuggestions('generateUsage', refs, prompt, suggestions, started, {
       judgedOk: filtered.length,
-      rejected: rejected.length,
-      promptLength: prompt.length,
-      suggestionSets: suggestions.length,
-      totalSuggestions: suggestions.reduce((acc, s) => acc + s.suggestions.length, 0),
-      suggestions: suggestionDetails,
-      durationMs: Math.round(performance.now() - started)
+      rejected: rejected.length
     })
     return suggestions
   } catch (err) {
-    await logAi('generateUsageError', refs, {
-      error: err instanceof Error ? err.message : String(err),
-      durationMs: Math.round(performance.now() - started)
-    })
-    throw err
+    return logBatchError('generateUsageError', refs, err, started)
   }
 }
@@ -5,18 +5,79 @@ export const SPLIT_LOG_MARKER = 'SPLIT_CONSIDERED_UNNECESSARY'
 export const TRANSLATION_IMPOSSIBLE_MARKER = 'TRANSLATION_CONSIDERED_IMPOSSIBLE'
 export const USAGE_IMPOSSIBLE_MARKER = 'USAGE_EXAMPLE_CONSIDERED_IMPOSSIBLE'
 
-function normalizeLanguageCode(code: string | null | undefined): string {
-  return (code || '').trim().toLowerCase()
+export type GlossResolver = Pick<GlossStorage, 'resolveReference'>
+
+/**
+ * Wrap a resolver so each ref is looked up at most once; goal checks revisit
+ * the same parts and translations many times
+ */
+export function memoizeResolver(storage: GlossResolver): GlossResolver {
+  const cache = new Map<string, Gloss | null>()
+  return {
+    resolveReference(ref: string) {
+      let gloss = cache.get(ref)
+      if (gloss === undefined) {
+        gloss = storage.resolveReference(ref)
+        cache.set(ref, gloss)
+      }
+      return gloss
+    }
+  }
 }
 
-function glossRef(gloss: Gloss): string {
+// Only a handful of distinct language codes exist, so this stays tiny
+const normalizedCodes = new Map<string, string>()
+
+export function normalizeLanguageCode(code: string | null | undefined): string {
+  if (!code) return ''
+  let normalized = normalizedCodes.get(code)
+  if (normalized === undefined) {
+    normalized = code.trim().toLowerCase()
+    if (normalizedCodes.size < 256) normalizedCodes.set(code, normalized)
+  }
+  return normalized
+}
+
+export function glossRef(gloss: Gloss): string {
   return `${gloss.language}:${gloss.slug || gloss.content}`
 }
 
-function hasLog(gloss: Gloss, marker: string): boolean {
-  const logs = gloss.logs || {}
-  if (typeof logs !== 'object') return false
-  return Object.values(logs).some((val) => String(val).includes(marker))
+export function hasLog(gloss: Gloss, marker: string): boolean {
+  return Object.values(gloss.logs).some((val) => String(val).includes(marker))
+}
+
+export function hasTag(gloss: Gloss, tag: string): boolean {
+  return gloss.tags.includes(tag)
+}
+
+export type TranslationLookup = (gloss: Gloss, lang: string) => readonly string[]
+
+const NO_REFS: readonly string[] = []
+
+/**
+ * Lookup for the translation refs of a gloss pointing into one (normalized)
+ * language. Refs are grouped by language prefix once per gloss for as long as
+ * the lookup lives, so create one per tree build or evaluation and drop it
+ * afterwards; edits made between builds are then always picked up.
+ */
+export function createTranslationLookup(): TranslationLookup {
+  const groups = new WeakMap<Gloss, Map<string, string[]>>()
+  return (gloss, lang) => {
+    if (!gloss.translations.length) return NO_REFS
+    let byLanguage = groups.get(gloss)
+    if (!byLanguage) {
+      byLanguage = new Map()
+      for (const ref of gloss.translations) {
+        const sep = ref.indexOf(':')
+        const refLang = normalizeLanguageCode(sep < 0 ? ref : ref.slice(0, sep))
+        const group = byLanguage.get(refLang)
+        if (group) group.push(ref)
+        else byLanguage.set(refLang, [ref])
+      }
+      groups.set(gloss, byLanguage)
+    }
+    return byLanguage.get(lang) ?? NO_REFS
+  }
 }
 
 /**
@@ -26,34 +87,56 @@ export function detectGoalType(
   gloss: Gloss,
   nativeLanguage: string,
   targetLanguage: string
+): 'procedural' | 'understanding' | null {
+  return goalTypeFor(gloss, normalizeLanguageCode(nativeLanguage), normalizeLanguageCode(targetLanguage))
+}
+
+/**
+ * detectGoalType for callers that already normalized both language codes,
+ * e.g. loops over all children of a situation
+ */
+export function goalTypeFor(
+  gloss: Gloss,
+  native: string,
+  target: string
 ): 'procedural' | 'understanding' | null {
   const lang = normalizeLanguageCode(gloss.language)
-  const native = normalizeLanguageCode(nativeLanguage)
-  const target = normalizeLanguageCode(targetLanguage)
-  const tags = gloss.tags || []
 
-  if (lang === native && tags.includes('eng:procedural-paraphrase-expression-goal')) {
+  if (lang === native && hasTag(gloss, 'eng:procedural-paraphrase-expression-goal')) {
     return 'procedural'
   }
-  if (lang === target && tags.includes('eng:understand-expression-goal')) {
+  if (lang === target && hasTag(gloss, 'eng:understand-expression-goal')) {
     return 'understanding'
   }
   return null
 }
 
-function usageExamples(storage: GlossStorage, g: Gloss): Gloss[] {
+/**
+ * Per-evaluation state: memoized lookups plus resolved translation lists,
+ * which the goal, branch and parts checks ask for repeatedly. Without
+ * `detailed`, checks stop at the first failure instead of collecting
+ * everything that is missing.
+ */
+type EvalContext = {
+  storage: GlossResolver
+  translations: WeakMap<Gloss, Map<string, Gloss[]>>
+  translationsInto: TranslationLookup
+  detailed: boolean
+}
+
+function usageExamples(ctx: EvalContext, g: Gloss): Gloss[] {
   const items: Gloss[] = []
-  for (const ref of g.usage_examples || []) {
-    const u = storage.resolveReference(ref)
+  for (const ref of g.usage_examples) {
+    const u = ctx.storage.resolveReference(ref)
     if (u) items.push(u)
   }
   return items
 }
 
-function parts(storage: GlossStorage, g: Gloss): Gloss[] {
+function parts(ctx: EvalContext, g: Gloss): Gloss[] {
   const items: Gloss[] = []
-  for (const ref of g.parts || []) {
-    const p = storage.resolveReference(ref)
+  for (const ref of g.parts) {
+    const p = ctx.storage.resolveReference(ref)
     if (p) items.push(p)
   }
   return items
@@ -61,26 +144,35 @@ function parts(storage: GlossStorage, g: Gloss): Gloss[] {
 
 export type GoalState = 'red' | 'yellow'
 
+export type GoalEvaluation = { state: GoalState; log: string }
+
 export function paraphraseDisplay(gloss: Gloss): string {
   return gloss.content || ''
 }
 
 function resolvedTranslations(
-  storage: GlossStorage,
+  ctx: EvalContext,
   g: Gloss,
   lang: string,
   requireNonParaphrase: boolean = false
 ): Gloss[] {
+  let byQuery = ctx.translations.get(g)
+  if (!byQuery) {
+    byQuery = new Map()
+    ctx.translations.set(g, byQuery)
+  }
+  const key = requireNonParaphrase ? `${lang}:non-paraphrase` : lang
+  const cached = byQuery.get(key)
+  if (cached) return cached
+
   const matches: Gloss[] = []
-  for (const ref of g.translations || []) {
-    const [refLangRaw] = ref.split(':')
-    const refLang = normalizeLanguageCode(refLangRaw)
-    if (refLang !== lang) continue
-    const tGloss = storage.resolveReference(ref)
+  for (const ref of ctx.translationsInto(g, lang)) {
+    const tGloss = ctx.storage.resolveReference(ref)
     if (!tGloss) continue
-    if (requireNonParaphrase && (tGloss.tags || []).includes('eng:paraphrase')) continue
+    if (requireNonParaphrase && hasTag(tGloss, 'eng:paraphrase')) continue
     matches.push(tGloss)
   }
+  byQuery.set(key, matches)
   return matches
 }
 
@@ -92,7 +184,7 @@ type PartsCheckResult = {
 }
 
 function standardPartsCheck(
-  storage: GlossStorage,
+  ctx: EvalContext,
   gloss: Gloss,
   native: string,
   target: string,
@@ -103,97 +195,116 @@ function standardPartsCheck(
   if (path.has(ref)) {
     return { ok: true, missingTranslations: [], missingParts: [], missingUsage: [] }
   }
-  const nextPath = new Set(path)
-  nextPath.add(ref)
-
-  const res: PartsCheckResult = {
-    ok: true,
-    missingTranslations: [],
-    missingParts: [],
-    missingUsage: []
-  }
+  // One shared path set for the whole recursion; the ref is removed again
+  // on the way out, so siblings can still reach it through other branches
+  path.add(ref)
+  try {
+    const res: PartsCheckResult = {
+      ok: true,
+      missingTranslations: [],
+      missingParts: [],
+      missingUsage: []
+    }
 
-  const lang = normalizeLanguageCode(gloss.language)
-  const counterpart = lang === target ? native : lang === native ? target : null
+    const lang = normalizeLanguageCode(gloss.language)
+    const counterpart = lang === target ? native : lang === native ? target : null
 
-  // parts presence or logged
-  const hasParts = (gloss.parts || []).length > 0 || hasLog(gloss, SPLIT_LOG_MARKER)
-  if (!hasParts) {
-    res.ok = false
-    res.missingParts.push(ref)
-  }
-
-  // translation requirement (to counterpart)
-  if (counterpart) {
-    const translations = resolvedTranslations(
-      storage,
-      gloss,
-      counterpart,
-      lang === native // only exclude paraphrase when translating native -> target
-    )
-    if (translations.length === 0 && !hasLog(gloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${counterpart}`)) {
+    // parts presence or logged
+    const hasParts = gloss.parts.length > 0 || hasLog(gloss, SPLIT_LOG_MARKER)
+    if (!hasParts) {
       res.ok = false
-      res.missingTranslations.push(ref)
+      res.missingParts.push(ref)
+      if (!ctx.detailed) return res
     }
-  }
 
-  // usage requirement only for target-language nodes (unless explicitly skipped)
-  const shouldCheckUsage = lang === target && !options?.skipUsageForRoot
-  if (shouldCheckUsage) {
-    const hasUsage = (gloss.usage_examples || []).length > 0 || hasLog(gloss, `${USAGE_IMPOSSIBLE_MARKER}:${target}`)
-    if (!hasUsage) {
-      res.ok = false
-      res.missingUsage.push(ref)
+    // translation requirement (to counterpart)
+    if (counterpart) {
+      const translations = resolvedTranslations(
+        ctx,
+        gloss,
+        counterpart,
+        lang === native // only exclude paraphrase when translating native -> target
+      )
+      if (translations.length === 0 && !hasLog(gloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${counterpart}`)) {
+        res.ok = false
+        res.missingTranslations.push(ref)
+        if (!ctx.detailed) return res
+      }
     }
-    for (const uGloss of usageExamples(storage, gloss)) {
-      const uTrans = resolvedTranslations(storage, uGloss, native)
-      if (uTrans.length === 0 && !hasLog(uGloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${native}`)) {
+
+    // usage requirement only for target-language nodes (unless explicitly skipped)
+    const shouldCheckUsage = lang === target && !options?.skipUsageForRoot
+    if (shouldCheckUsage) {
+      const hasUsage = gloss.usage_examples.length > 0 || hasLog(gloss, `${USAGE_IMPOSSIBLE_MARKER}:${target}`)
+      if (!hasUsage) {
         res.ok = false
-        res.missingTranslations.push(glossRef(uGloss))
+        res.missingUsage.push(ref)
+        if (!ctx.detailed) return res
+      }
+      for (const uGloss of usageExamples(ctx, gloss)) {
+        const uTrans = resolvedTranslations(ctx, uGloss, native)
+        if (uTrans.length === 0 && !hasLog(uGloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${native}`)) {
+          res.ok = false
+          res.missingTranslations.push(glossRef(uGloss))
+          if (!ctx.detailed) return res
+        }
       }
     }
-  }
 
-  // Recurse into parts
-  for (const part of parts(storage, gloss)) {
-    const child = standardPartsCheck(storage, part, native, target, nextPath)
-    if (!child.ok) res.ok = false
-    res.missingTranslations.push(...child.missingTranslations)
-    res.missingParts.push(...child.missingParts)
-    res.missingUsage.push(...child.missingUsage)
-  }
+    // Recurse into parts
+    for (const part of parts(ctx, gloss)) {
+      const child = standardPartsCheck(ctx, part, native, target, path)
+      if (!child.ok) {
+        res.ok = false
+        if (!ctx.detailed) return res
+      }
+      res.missingTranslations.push(...child.missingTranslations)
+      res.missingParts.push(...child.missingParts)
+      res.missingUsage.push(...child.missingUsage)
+    }
 
-  return res
+    return res
+  } finally {
+    path.delete(ref)
+  }
 }
 
 /**
- * Compute RED/YELLOW for a goal in the context of native/target languages
+ * Compute RED/YELLOW for a goal in the context of native/target languages.
+ * With `log: false` no requirement log is built and evaluation stops at the
+ * first failed requirement.
  */
 export function evaluateGoalState(
   gloss: Gloss,
-  storage: GlossStorage,
+  glossStorage: GlossResolver,
   nativeLanguage: string,
-  targetLanguage: string
-): { state: GoalState; log: string } {
+  targetLanguage: string,
+  options: { log?: boolean } = {}
+): GoalEvaluation {
+  const detailed = options.log ?? true
+  const ctx: EvalContext = {
+    storage: memoizeResolver(glossStorage),
+    translations: new WeakMap(),
+    translationsInto: createTranslationLookup(),
+    detailed
+  }
   const native = normalizeLanguageCode(nativeLanguage)
   const target = normalizeLanguageCode(targetLanguage)
   const goalLang = normalizeLanguageCode(gloss.language)
-  const tags = gloss.tags || []
 
-  const goalKind = detectGoalType(gloss, native, target)
+  const goalKind = goalTypeFor(gloss, native, target)
   const goalRef = glossRef(gloss)
-  const lines: string[] = [
-    `goal=${goalRef}`,
-    `kind=${goalKind || 'unknown'}`,
-    `native=${native}`,
-    `target=${target}`
-  ]
+  const lines: string[] = detailed
+    ? [`goal=${goalRef}`, `kind=${goalKind || 'unknown'}`, `native=${native}`, `target=${target}`]
+    : []
+  const red: GoalEvaluation = { state: 'red', log: '' }
 
   function section(title: string) {
-    lines.push(`${title}:`)
+    if (detailed) lines.push(`${title}:`)
   }
 
   function check(desc: string, passed: boolean, missing: string[] | null = null): boolean {
+    if (!detailed) return passed
     lines.push(`- [${passed ? 'x' : ' '}] ${desc}`)
     if (!passed && missing && missing.length) {
       for (const item of missing) {
@@ -208,26 +319,31 @@ export function evaluateGoalState(
   if (goalKind === 'understanding') {
     section('requirements')
     const cLang = check('goal expression is in target language', goalLang === target, [goalRef])
-    const goalNativeTrans = resolvedTranslations(storage, gloss, native)
+    if (!cLang && !detailed) return red
+    const goalNativeTrans = resolvedTranslations(ctx, gloss, native)
     const cT1 = check(
       'goal has translation into native (or logged impossible)',
       goalNativeTrans.length > 0 || hasLog(gloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${native}`),
       goalNativeTrans.length < 1 ? [goalRef] : null
     )
-    const partsCheck = standardPartsCheck(storage, gloss, native, target, new Set(), {
+    if (!cT1 && !detailed) return red
+    const partsCheck = standardPartsCheck(ctx, gloss, native, target, new Set(), {
       skipUsageForRoot: true
     })
     const cParts = check(
       'goal and its parts satisfy standard parts recursion (parts + translations + usage-on-target)',
       partsCheck.ok,
-      [...new Set([...partsCheck.missingParts, ...partsCheck.missingTranslations, ...partsCheck.missingUsage])]
+      detailed
+        ? [...new Set([...partsCheck.missingParts, ...partsCheck.missingTranslations, ...partsCheck.missingUsage])]
+        : null
     )
     yellowOk = cLang && cT1 && cParts
   } else if (goalKind === 'procedural') {
     section('requirements')
     const cLang = check('goal expression is in native language', goalLang === native, [goalRef])
-    const cTag = check('goal tagged eng:paraphrase', tags.includes('eng:paraphrase'), [goalRef])
-    const goalTargetTransGlosses = resolvedTranslations(storage, gloss, target, true)
+    const cTag = check('goal tagged eng:paraphrase', hasTag(gloss, 'eng:paraphrase'), [goalRef])
+    if (!(cLang && cTag) && !detailed) return red
+    const goalTargetTransGlosses = resolvedTranslations(ctx, gloss, target, true)
     const cT1 = check(
       'goal has translation into target (non-paraphrase) or logged impossible',
       goalTargetTransGlosses.length > 0 || hasLog(gloss, `${TRANSLATION_IMPOSSIBLE_MARKER}:${target}`),
@@ -235,21 +351,25 @@ export function evaluateGoalState(
     )
     const cPartsChecked = check(
       'goal checked for parts (has parts or logged unsplittable)',
-      (gloss.parts || []).length > 0 || hasLog(gloss, SPLIT_LOG_MARKER),
-      (gloss.parts || []).length > 0 || hasLog(gloss, SPLIT_LOG_MARKER) ? null : [goalRef]
+      gloss.parts.length > 0 || hasLog(gloss, SPLIT_LOG_MARKER),
+      gloss.parts.length > 0 || hasLog(gloss, SPLIT_LOG_MARKER) ? null : [goalRef]
     )
+    if (!(cT1 && cPartsChecked) && !detailed) return red
 
     let translationBranchesOk = true
     const missing: string[] = []
     for (const tGloss of goalTargetTransGlosses) {
-      const branch = standardPartsCheck(storage, tGloss, native, target, new Set())
-      if (!branch.ok) translationBranchesOk = false
+      const branch = standardPartsCheck(ctx, tGloss, native, target, new Set())
+      if (!branch.ok) {
+        translationBranchesOk = false
+        if (!detailed) return red
+      }
       missing.push(...branch.missingParts, ...branch.missingTranslations, ...branch.missingUsage)
     }
 
     let rootPartsOk = true
-    if ((gloss.parts || []).length) {
-      const rootBranch = standardPartsCheck(storage, gloss, native, target, new Set(), {
+    if (gloss.parts.length) {
+      const rootBranch = standardPartsCheck(ctx, gloss, native, target, new Set(), {
         skipUsageForRoot: false
       })
       if (!rootBranch.ok) rootPartsOk = false
@@ -270,15 +390,16 @@ export function evaluateGoalState(
   }
 
   const state: GoalState = yellowOk ? 'yellow' : 'red'
+  if (!detailed) return { state, log: '' }
   lines.push(`state=${state}`)
   return { state, log: lines.join('\n') }
 }
 
 export function determineGoalState(
   gloss: Gloss,
-  storage: GlossStorage,
+  storage: GlossResolver,
   nativeLanguage: string,
   targetLanguage: string
 ): GoalState {
-  return evaluateGoalState(gloss, storage, nativeLanguage, targetLanguage).state
+  return evaluateGoalState(gloss, storage, nativeLanguage, targetLanguage, { log: false }).state
 }
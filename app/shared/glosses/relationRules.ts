@@ -0,0 +1,52 @@
+/**
+ * Relationship rules ported from src/shared/storage.py
+ */
+
+export const RELATIONSHIP_FIELDS = [
+  'morphologically_related',
+  'parts',
+  'has_similar_meaning',
+  'sounds_similar',
+  'usage_examples',
+  'to_be_differentiated_from',
+  'collocations',
+  'typical_follow_up',
+  'children',
+  'translations',
+  'notes',
+  'tags'
+] as const
+
+const RELATIONSHIP_FIELD_SET: ReadonlySet<string> = new Set(RELATIONSHIP_FIELDS)
+
+export const WITHIN_LANGUAGE_RELATIONS = new Set([
+  'morphologically_related',
+  'parts',
+  'has_similar_meaning',
+  'sounds_similar',
+  'usage_examples',
+  'to_be_differentiated_from',
+  'collocations',
+  'typical_follow_up'
+])
+
+export const CROSS_LANGUAGE_RELATIONS = new Set([
+  'translations',
+  'notes',
+  'tags',
+  'children'
+])
+
+export const SYMMETRICAL_RELATIONS = new Set([
+  'morphologically_related',
+  'has_similar_meaning',
+  'sounds_similar',
+  'to_be_differentiated_from',
+  'translations'
+])
+
+export type RelationshipField = typeof RELATIONSHIP_FIELDS[number]
+
+export function isRelationshipField(field: string): field is RelationshipField {
+  return RELATIONSHIP_FIELD_SET.has(field)
+}